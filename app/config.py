@@ -1,13 +1,20 @@
 """
 Configuration management for Question Paper Generator
 """
-from pydantic_settings import BaseSettings
-from typing import Optional
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import FrozenSet, Optional, Tuple
 
 
 class Settings(BaseSettings):
     """Application settings"""
     
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        frozen=True
+    )
+    
     # Application
     APP_NAME: str = "Question Paper Generator API"
     APP_VERSION: str = "1.0.0"
@@ -18,14 +25,14 @@ class Settings(BaseSettings):
     PORT: int = 8000
     
     # CORS
-    CORS_ORIGINS: list = ["*", "question-paper-generator-backend.vercel.app"]
+    CORS_ORIGINS: Tuple[str, ...] = ("*", "question-paper-generator-backend.vercel.app")
     
     # API Keys
     GEMINI_API_KEY: str
     
     # File Upload
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
-    ALLOWED_EXTENSIONS: list = [".pdf", ".txt"]
+    ALLOWED_EXTENSIONS: FrozenSet[str] = frozenset({".pdf", ".txt"})
     UPLOAD_DIR: str = "uploads"
     GENERATED_DIR: str = "generated"
     
@@ -33,6 +40,10 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-pro"
     GEMINI_TEMPERATURE: float = 0.7
     GEMINI_MAX_TOKENS: Optional[int] = None
+    GEMINI_CONCURRENCY: int = 8  # max in-flight Gemini calls per generator
+    SEMANTIC_CACHE: bool = False  # reuse questions across units with near-identical topics
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9  # minimum word-set (Jaccard) similarity
+    TRUST_GENERATED_QUESTIONS: bool = True  # build questions without re-validating parsed output
     
     # Generation Limits
     MAX_QUESTIONS_PER_REQUEST: int = 100
@@ -40,11 +51,13 @@ class Settings(BaseSettings):
     
     # Database (Optional - for future use)
     DATABASE_URL: Optional[str] = None
-    
-    class Config:
-        env_file = ".env.example"
-        case_sensitive = True
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the cached settings instance (parsed from the environment once)"""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
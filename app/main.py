@@ -3,14 +3,17 @@ Main FastAPI application for Question Paper Generator
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from app.config import settings
-from app.models import HealthResponse
+from app.models import HealthResponse, warm_up_schemas
 from app.routers import syllabus, question_paper
 from app.utils.storage import get_storage
+from app.health_interceptor import HealthCheckInterceptor
 import logging
 import os
+from contextlib import asynccontextmanager
 
 # Configure logging
 logging.basicConfig(
@@ -19,6 +22,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Static assets directory; only mounted if it exists at import time
+STATIC_DIR = "static"
+
+# Storage instance (the same singleton the routers bind at import)
+storage = get_storage()
+
+
+def get_counts():
+    """Return (syllabi_count, papers_count) for the startup log"""
+    return storage.count_items("syllabi"), storage.count_items("question_papers")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run application startup, then shutdown once the server stops"""
+    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    logger.info(f"Debug mode: {settings.DEBUG}")
+    
+    # Verify directories exist
+    import os
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    os.makedirs(settings.GENERATED_DIR, exist_ok=True)
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    os.makedirs("storage", exist_ok=True)
+    logger.info("Upload, generated, static, and storage directories verified")
+    
+    # Initialize storage
+    syllabi_count, papers_count = get_counts()
+    logger.info(f"📚 Loaded {syllabi_count} syllabi and {papers_count} question papers from persistent storage")
+    
+    # Compile model validators and the OpenAPI schema before the first request
+    warm_up_schemas()
+    app.openapi()
+    logger.info("Pydantic schemas and OpenAPI document warmed up")
+    
+    yield
+    
+    logger.info("Shutting down application")
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -26,8 +69,14 @@ app = FastAPI(
     description="AI-powered question paper generator using Google Gemini",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+# Answer GET / and GET /health before routing; added before CORS so the CORS
+# middleware still wraps the probes (middleware added later runs outermost)
+app.add_middleware(HealthCheckInterceptor)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -37,40 +86,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-@app.on_event("startup")
-async def startup_event():
-    """Run on application startup"""
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    logger.info(f"Debug mode: {settings.DEBUG}")
-    
-    # Verify directories exist
-    import os
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    os.makedirs(settings.GENERATED_DIR, exist_ok=True)
-    os.makedirs("static", exist_ok=True)
-    os.makedirs("storage", exist_ok=True)
-    logger.info("Upload, generated, static, and storage directories verified")
-    
-    # Initialize storage
-    storage = get_storage()
-    syllabi_count = len(storage.list_items("syllabi"))
-    papers_count = len(storage.list_items("question_papers"))
-    logger.info(f"📚 Loaded {syllabi_count} syllabi and {papers_count} question papers from persistent storage")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Run on application shutdown"""
-    logger.info("Shutting down application")
+# Compress JSON (question papers are text-heavy) and PDF responses for clients
+# that send Accept-Encoding: gzip; bodies under 1 KB are passed through as-is
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 
+# GET / and GET /health are answered by HealthCheckInterceptor before routing,
+# so these two handlers are never called; they stay registered so both probes
+# are documented in the OpenAPI schema
 @app.get("/", response_model=HealthResponse)
 async def root():
     """Root endpoint - health check"""
-    storage = get_storage()
-    syllabi_count = len(storage.list_items("syllabi"))
-    
     return HealthResponse(
         status="healthy",
         version=settings.APP_VERSION
@@ -79,13 +105,7 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint with syllabi count"""
-    storage = get_storage()
-    syllabi_count = len(storage.list_items("syllabi"))
-    papers_count = len(storage.list_items("question_papers"))
-    
-    logger.info(f"Health check: {syllabi_count} syllabi, {papers_count} question papers")
-    
+    """Health check endpoint"""
     return HealthResponse(
         status="healthy",
         version=settings.APP_VERSION
@@ -106,8 +126,8 @@ app.include_router(
 )
 
 # Mount static files
-if os.path.exists("static"):
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+if os.path.isdir(STATIC_DIR):
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
     logger.info("Static files mounted at /static")
 
 
@@ -116,7 +136,7 @@ if os.path.exists("static"):
 async def global_exception_handler(request, exc):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -12,11 +12,13 @@ from app.models.schemas import (
     GenerationRules,
     Question,
     QuestionPaper,
+    QuestionPaperSummary,
     GenerateQuestionPaperRequest,
     HealthResponse,
     ErrorResponse,
     AnswerKey,
     AnswerKeyItem,
+    warm_up_schemas,
 )
 
 __all__ = [
@@ -30,9 +32,11 @@ __all__ = [
     "GenerationRules",
     "Question",
     "QuestionPaper",
+    "QuestionPaperSummary",
     "GenerateQuestionPaperRequest",
     "HealthResponse",
     "ErrorResponse",
     "AnswerKey",
     "AnswerKeyItem",
+    "warm_up_schemas",
 ]
@@ -1,10 +1,16 @@
 """
 Pydantic models for Question Paper Generator
 """
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
+from functools import cached_property, lru_cache, partial
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
+
+from app.config import settings
+
+# Timezone-aware replacement for the deprecated datetime.utcnow
+_utcnow = partial(datetime.now, timezone.utc)
 
 
 class DifficultyLevel(str, Enum):
@@ -48,8 +54,8 @@ class Syllabus(BaseModel):
     course_name: str = Field(..., description="Name of the course")
     content: str = Field(..., description="Raw syllabus content")
     units: List[Unit] = Field(default_factory=list, description="Parsed units")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
 
     class Config:
         json_schema_extra = {
@@ -64,7 +70,12 @@ class Syllabus(BaseModel):
 class SyllabusUploadRequest(BaseModel):
     """Request model for uploading syllabus as text"""
     course_name: str = Field(..., description="Name of the course")
-    content: str = Field(..., min_length=10, description="Syllabus content")
+    content: str = Field(
+        ...,
+        min_length=10,
+        max_length=settings.MAX_UPLOAD_SIZE,
+        description="Syllabus content"
+    )
 
     class Config:
         json_schema_extra = {
@@ -99,27 +110,42 @@ class DifficultyDistribution(BaseModel):
     medium: int = Field(default=40, ge=0, le=100, description="Percentage of medium questions")
     hard: int = Field(default=20, ge=0, le=100, description="Percentage of hard questions")
 
-    @validator('hard')
-    def validate_total(cls, v, values):
+    model_config = ConfigDict(frozen=True)
+
+    @model_validator(mode="after")
+    def validate_total(self):
         """Ensure percentages add up to 100"""
-        total = values.get('easy', 0) + values.get('medium', 0) + v
+        total = self.easy + self.medium + self.hard
         if total != 100:
             raise ValueError(f"Difficulty percentages must sum to 100, got {total}")
-        return v
+        return self
+
+
+@lru_cache(maxsize=1)
+def _default_difficulty_distribution() -> DifficultyDistribution:
+    """Shared default distribution (safe to reuse since the model is frozen)"""
+    return DifficultyDistribution()
 
 
 class GenerationRules(BaseModel):
     """Rules for generating question paper"""
     question_types: List[QuestionTypeConfig] = Field(..., description="Question type configurations")
     difficulty_distribution: DifficultyDistribution = Field(
-        default_factory=DifficultyDistribution,
+        default_factory=_default_difficulty_distribution,
         description="Difficulty distribution"
     )
     unit_selection: str = Field(default="all", description="'all' or comma-separated unit IDs")
     include_answer_key: bool = Field(default=True, description="Include answer key")
     randomize_order: bool = Field(default=True, description="Randomize question order")
+    shuffle_seed: Optional[int] = Field(default=None, description="Seed for a reproducible question order")
     randomize_options: bool = Field(default=True, description="Randomize MCQ options")
 
+    @computed_field
+    @cached_property
+    def total_count(self) -> int:
+        """Total number of questions across all question types"""
+        return sum(qt.count for qt in self.question_types)
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -173,7 +199,7 @@ class QuestionPaper(BaseModel):
     id: str = Field(..., description="Unique question paper ID")
     syllabus_id: str = Field(..., description="Associated syllabus ID")
     course_name: str = Field(..., description="Course name")
-    generated_at: datetime = Field(default_factory=datetime.utcnow)
+    generated_at: datetime = Field(default_factory=_utcnow)
     total_marks: int = Field(..., description="Total marks")
     total_questions: int = Field(..., description="Total number of questions")
     questions: List[Question] = Field(..., description="List of questions")
@@ -195,11 +221,42 @@ class QuestionPaper(BaseModel):
         }
 
 
+class QuestionPaperSummary(BaseModel):
+    """Question paper metadata returned by the list endpoint"""
+    id: str = Field(..., description="Unique question paper ID")
+    syllabus_id: Optional[str] = Field(None, description="Associated syllabus ID")
+    course_name: str = Field(..., description="Course name")
+    generated_at: Optional[datetime] = Field(None, description="When the paper was generated")
+    total_marks: int = Field(..., description="Total marks")
+    total_questions: int = Field(..., description="Total number of questions")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "qp_12345",
+                "syllabus_id": "syl_789",
+                "course_name": "Data Structures",
+                "generated_at": "2023-01-01T12:00:00Z",
+                "total_marks": 100,
+                "total_questions": 35
+            }
+        }
+
+
 class GenerateQuestionPaperRequest(BaseModel):
     """Request model for generating a question paper"""
     syllabus_id: str = Field(..., description="ID of the syllabus to use")
     generation_rules: GenerationRules = Field(..., description="Generation rules")
 
+    @model_validator(mode="after")
+    def validate_question_limit(self):
+        """Reject requests asking for more questions than the server allows"""
+        if self.generation_rules.total_count > settings.MAX_QUESTIONS_PER_REQUEST:
+            raise ValueError(
+                f"Too many questions requested. Max: {settings.MAX_QUESTIONS_PER_REQUEST}"
+            )
+        return self
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -217,7 +274,7 @@ class GenerateQuestionPaperRequest(BaseModel):
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str = Field(default="healthy")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
     version: str = Field(default="1.0.0")
 
 
@@ -225,7 +282,7 @@ class ErrorResponse(BaseModel):
     """Error response model"""
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Detailed error information")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
 
 
 class AnswerKeyItem(BaseModel):
@@ -278,3 +335,31 @@ class AnswerKey(BaseModel):
                 ]
             }
         }
+
+
+def _example(model) -> Dict[str, Any]:
+    """Return the json_schema_extra example declared on a model"""
+    return model.model_config["json_schema_extra"]["example"]
+
+
+def warm_up_schemas() -> None:
+    """
+    Build validators and JSON schemas for the API models ahead of the first request
+
+    Validates each model's own documented example so pydantic-core compiles
+    every nested validator at startup rather than on the first request.
+    """
+    for model in (Syllabus, SyllabusUploadRequest, GenerateQuestionPaperRequest,
+                  QuestionPaper, QuestionPaperSummary, AnswerKey, HealthResponse):
+        model.model_rebuild()
+        model.model_json_schema()
+
+    Syllabus.model_validate(_example(Syllabus))
+    SyllabusUploadRequest.model_validate(_example(SyllabusUploadRequest))
+    GenerateQuestionPaperRequest.model_validate(_example(GenerateQuestionPaperRequest))
+    AnswerKey.model_validate(_example(AnswerKey))
+    QuestionPaper.model_validate({
+        **_example(QuestionPaper),
+        "questions": [_example(Question)],
+        "generation_rules": _example(GenerationRules),
+    })
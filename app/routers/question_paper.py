@@ -2,23 +2,26 @@
 Question Paper router - handles question paper generation
 """
 from fastapi import APIRouter, HTTPException, status, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 import logging
-import uuid
+import re
+import secrets
+from collections import Counter
 from datetime import datetime
+from typing import AsyncIterator, BinaryIO, List, Optional
 
 from app.models import (
     QuestionPaper,
+    QuestionPaperSummary,
     GenerateQuestionPaperRequest,
     ErrorResponse,
     Syllabus,
-    AnswerKey,
-    AnswerKeyItem
+    Unit,
+    AnswerKey
 )
-from app.services.question_generator import QuestionGenerator
-from app.services.pdf_generator import PDFGenerator
+from app.services.question_generator import get_question_generator
+from app.services.pdf_generator import get_pdf_generator
 from app.utils.storage import get_storage
-from app.config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -27,6 +30,15 @@ router = APIRouter()
 storage = get_storage()
 SYLLABI_STORE = "syllabi"
 QUESTION_PAPERS_STORE = "question_papers"
+storage.register_index(QUESTION_PAPERS_STORE, tuple(QuestionPaperSummary.model_fields))
+PDF_CHUNK_SIZE = 64 * 1024
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+async def _iter_pdf(pdf_buffer: BinaryIO) -> AsyncIterator[bytes]:
+    """Yield a rendered PDF in fixed-size chunks"""
+    while chunk := pdf_buffer.read(PDF_CHUNK_SIZE):
+        yield chunk
 
 
 @router.post("/generate", response_model=QuestionPaper, status_code=status.HTTP_201_CREATED)
@@ -45,7 +57,12 @@ async def generate_question_paper(request: GenerateQuestionPaperRequest):
                 detail=f"Syllabus with ID {request.syllabus_id} not found"
             )
         
-        syllabus = Syllabus(**syllabus_dict)
+        # Stored syllabi are trusted, so skip re-validation; model_construct
+        # doesn't recurse, so units are built explicitly
+        syllabus = Syllabus.model_construct(**{
+            **syllabus_dict,
+            "units": [Unit.model_construct(**unit) for unit in syllabus_dict.get("units", [])]
+        })
         
         # Validate units exist
         if not syllabus.units:
@@ -54,46 +71,39 @@ async def generate_question_paper(request: GenerateQuestionPaperRequest):
                 detail="Syllabus has no parsed units. Please upload a valid syllabus."
             )
         
-        # Calculate total questions
-        total_questions = sum(qt.count for qt in request.generation_rules.question_types)
-        if total_questions > settings.MAX_QUESTIONS_PER_REQUEST:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Too many questions requested. Max: {settings.MAX_QUESTIONS_PER_REQUEST}"
-            )
-        
         # Generate questions
-        generator = QuestionGenerator()
+        generator = get_question_generator()
         questions = await generator.generate_questions(
             syllabus=syllabus,
             rules=request.generation_rules
         )
         
-        # Calculate metrics
-        total_marks = sum(q.marks for q in questions)
-        units_coverage = {}
+        # Calculate metrics in a single pass over the questions
+        total_marks = 0
+        units_coverage = Counter()
         for question in questions:
-            units_coverage[question.unit_id] = units_coverage.get(question.unit_id, 0) + 1
+            total_marks += question.marks
+            units_coverage[question.unit_id] += 1
         
         # Create question paper
         question_paper = QuestionPaper(
-            id=f"qp_{uuid.uuid4().hex[:8]}",
+            id=f"qp_{secrets.token_hex(4)}",
             syllabus_id=request.syllabus_id,
             course_name=syllabus.course_name,
             total_marks=total_marks,
             total_questions=len(questions),
             questions=questions,
             generation_rules=request.generation_rules,
-            units_coverage=units_coverage
+            units_coverage=dict(units_coverage)
         )
         
-        # Store persistently
-        question_paper_dict = question_paper.model_dump()
+        # Store persistently (JSON mode so stored records can be served as-is)
+        question_paper_dict = question_paper.model_dump(mode="json")
         storage.set_item(QUESTION_PAPERS_STORE, question_paper.id, question_paper_dict)
         
         logger.info(f"✓ Question paper generated with ID: {question_paper.id}")
         logger.info(f"✓ Question paper saved to persistent storage")
-        return question_paper
+        return ORJSONResponse(question_paper_dict, status_code=status.HTTP_201_CREATED)
         
     except HTTPException:
         raise
@@ -109,6 +119,9 @@ async def generate_question_paper(request: GenerateQuestionPaperRequest):
 async def get_question_paper(paper_id: str):
     """
     Get a question paper by ID
+    
+    Reads go through storage's stamped store cache, so a paper rewritten or
+    deleted by another worker or script is seen on the next request.
     """
     paper_dict = storage.get_item(QUESTION_PAPERS_STORE, paper_id)
     if not paper_dict:
@@ -117,17 +130,26 @@ async def get_question_paper(paper_id: str):
             detail=f"Question paper with ID {paper_id} not found"
         )
     
-    return QuestionPaper(**paper_dict)
+    return ORJSONResponse(paper_dict)
 
 
-@router.get("/", response_model=list[QuestionPaper])
-async def list_question_papers():
+@router.get("/", response_model=List[QuestionPaperSummary])
+async def list_question_papers(
+    limit: Optional[int] = Query(None, ge=0, description="Return at most this many papers")
+):
     """
     List all question papers
+    
+    Returns summaries from the storage index so listing never loads the
+    full question lists. The total is always sent in X-Total-Count, so
+    limit=0 is a cheap count.
     """
-    papers_dict = storage.list_items(QUESTION_PAPERS_STORE)
-    logger.info(f"Listing question papers - found {len(papers_dict)} papers in storage")
-    return [QuestionPaper(**paper) for paper in papers_dict.values()]
+    summaries = storage.list_item_summaries(QUESTION_PAPERS_STORE)
+    logger.info(f"Listing question papers - found {len(summaries)} papers in storage")
+    total = len(summaries)
+    if limit is not None:
+        summaries = summaries[:limit]
+    return ORJSONResponse(summaries, headers={"X-Total-Count": str(total)})
 
 
 @router.delete("/{paper_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -135,14 +157,18 @@ async def delete_question_paper(paper_id: str):
     """
     Delete a question paper
     """
-    paper_dict = storage.get_item(QUESTION_PAPERS_STORE, paper_id)
-    if not paper_dict:
+    if not storage.get_item(QUESTION_PAPERS_STORE, paper_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Question paper with ID {paper_id} not found"
         )
     
-    storage.delete_item(QUESTION_PAPERS_STORE, paper_id)
+    if not storage.delete_item(QUESTION_PAPERS_STORE, paper_id):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete question paper {paper_id}"
+        )
+    
     logger.info(f"✓ Deleted question paper: {paper_id}")
     return None
 
@@ -173,21 +199,23 @@ async def download_question_paper_pdf(
         
         question_paper = QuestionPaper(**paper_dict)
         
-        # Generate PDF
-        pdf_generator = PDFGenerator()
-        pdf_buffer = pdf_generator.generate_pdf(question_paper, include_answers)
+        # Generate PDF (rendered in a worker thread)
+        pdf_generator = get_pdf_generator()
+        pdf_buffer = await pdf_generator.generate_pdf_async(question_paper, include_answers)
+        pdf_size = pdf_buffer.seek(0, 2)
+        pdf_buffer.seek(0)
         
         # Create filename
-        safe_course_name = "".join(c for c in question_paper.course_name if c.isalnum() or c in (' ', '-', '_')).strip()
-        safe_course_name = safe_course_name.replace(' ', '_')
+        safe_course_name = _UNSAFE_FILENAME_CHARS.sub("_", question_paper.course_name).strip("_")
         filename = f"{safe_course_name}_{paper_id}.pdf"
         
         # Return PDF as streaming response
         return StreamingResponse(
-            pdf_buffer,
+            _iter_pdf(pdf_buffer),
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Content-Length": str(pdf_size)
             }
         )
         
@@ -215,32 +243,31 @@ async def get_answer_key(paper_id: str):
                 detail=f"Question paper with ID {paper_id} not found"
             )
         
-        question_paper = QuestionPaper(**paper_dict)
+        # Stored papers were validated on the way in, so the answer key is
+        # assembled from the raw record instead of AnswerKeyItem/AnswerKey models
+        answers = [
+            {
+                "question_id": question["id"],
+                "question_number": i,
+                "question_text": question.get("question_text"),
+                "type": question["type"],
+                "marks": question["marks"],
+                "correct_answer": question.get("correct_answer") or "Not available",
+                "explanation": question.get("answer_explanation")
+            }
+            for i, question in enumerate(paper_dict.get("questions", []), 1)
+        ]
         
-        # Transform questions into answer key items
-        answers = []
-        for i, question in enumerate(question_paper.questions, 1):
-            answers.append(AnswerKeyItem(
-                question_id=question.id,
-                question_number=i,
-                question_text=question.question_text,
-                type=question.type,
-                marks=question.marks,
-                correct_answer=question.correct_answer or "Not available",
-                explanation=question.answer_explanation
-            ))
-            
-        # Create answer key
-        answer_key = AnswerKey(
-            paper_id=question_paper.id,
-            course_name=question_paper.course_name,
-            total_marks=question_paper.total_marks,
-            generated_at=question_paper.generated_at,
-            answers=answers
-        )
+        answer_key = {
+            "paper_id": paper_dict["id"],
+            "course_name": paper_dict["course_name"],
+            "total_marks": paper_dict["total_marks"],
+            "generated_at": paper_dict["generated_at"],
+            "answers": answers
+        }
         
         logger.info(f"Answer key retrieved for paper: {paper_id}")
-        return answer_key
+        return ORJSONResponse(answer_key)
         
     except HTTPException:
         raise
@@ -1,11 +1,12 @@
 """
 Syllabus router - handles syllabus upload and parsing
 """
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 import logging
-import os
-import uuid
+import secrets
 from datetime import datetime
 
 from app.models import (
@@ -22,7 +23,31 @@ router = APIRouter()
 
 # Storage instance
 storage = get_storage()
+# Parser holds only its patterns, so one instance serves every request
+parser = SyllabusParser()
 SYLLABI_STORE = "syllabi"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def _read_upload(file: UploadFile) -> bytes:
+    """
+    Read an uploaded file in chunks, rejecting it as soon as it exceeds the size limit
+    
+    Args:
+        file: Uploaded file
+        
+    Returns:
+        File content as bytes
+    """
+    content = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        content += chunk
+        if len(content) > settings.MAX_UPLOAD_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE / (1024*1024)}MB"
+            )
+    return bytes(content)
 
 
 @router.post("/upload/text", response_model=Syllabus, status_code=status.HTTP_201_CREATED)
@@ -33,20 +58,20 @@ async def upload_syllabus_text(request: SyllabusUploadRequest):
     try:
         logger.info(f"Uploading syllabus for course: {request.course_name}")
         
-        # Parse the syllabus
-        parser = SyllabusParser()
-        units = parser.parse_text(request.content)
+        # Parse the syllabus in a worker thread (CPU-bound)
+        units = await run_in_threadpool(parser.parse_text, request.content)
         
-        # Create syllabus object
-        syllabus = Syllabus(
-            id=f"syl_{uuid.uuid4().hex[:8]}",
+        # Create syllabus object (inputs are already validated, so skip
+        # re-validating the content)
+        syllabus = Syllabus.model_construct(
+            id=f"syl_{secrets.token_hex(4)}",
             course_name=request.course_name,
             content=request.content,
             units=units
         )
         
-        # Store persistently
-        syllabus_dict = syllabus.model_dump()
+        # Store persistently (JSON mode, serialized by orjson in storage)
+        syllabus_dict = syllabus.model_dump(mode="json")
         storage.set_item(SYLLABI_STORE, syllabus.id, syllabus_dict)
         
         logger.info(f"✓ Syllabus created with ID: {syllabus.id}, Units: {len(units)}")
@@ -73,45 +98,44 @@ async def upload_syllabus_file(
         logger.info(f"Uploading file: {file.filename} for course: {course_name}")
         
         # Validate file extension
-        file_ext = os.path.splitext(file.filename)[1].lower()
+        filename = file.filename or ""
+        dot = filename.rfind(".")
+        file_ext = filename[dot:].lower() if dot > 0 else ""
         if file_ext not in settings.ALLOWED_EXTENSIONS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid file type. Allowed: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+                detail=f"Invalid file type. Allowed: {', '.join(sorted(settings.ALLOWED_EXTENSIONS))}"
             )
         
-        # Read file content
-        content = await file.read()
-        
-        # Validate file size
-        if len(content) > settings.MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE / (1024*1024)}MB"
-            )
+        # Read file content (size is validated while reading), then release the
+        # upload's spooled temp file right away instead of after parsing
+        try:
+            content = await _read_upload(file)
+        finally:
+            await file.close()
         
-        # Parse based on file type (no file system writes)
-        parser = SyllabusParser()
-        file_id = uuid.uuid4().hex[:8]
+        # Parse based on file type (no file system writes), off the event loop
+        file_id = secrets.token_hex(4)
         
         if file_ext == ".pdf":
             # Parse PDF from bytes directly
-            text_content = parser.extract_text_from_pdf_bytes(content)
+            text_content = await run_in_threadpool(parser.extract_text_from_pdf_bytes, content)
         else:  # .txt
             text_content = content.decode('utf-8')
         
-        units = parser.parse_text(text_content)
+        units = await run_in_threadpool(parser.parse_text, text_content)
         
-        # Create syllabus object
-        syllabus = Syllabus(
+        # Create syllabus object (inputs are already validated, so skip
+        # re-validating the content)
+        syllabus = Syllabus.model_construct(
             id=f"syl_{file_id}",
             course_name=course_name,
             content=text_content,
             units=units
         )
         
-        # Store persistently
-        syllabus_dict = syllabus.model_dump()
+        # Store persistently (JSON mode, serialized by orjson in storage)
+        syllabus_dict = syllabus.model_dump(mode="json")
         storage.set_item(SYLLABI_STORE, syllabus.id, syllabus_dict)
         
         logger.info(f"✓ Syllabus created with ID: {syllabus.id}, Units: {len(units)}")
@@ -132,6 +156,9 @@ async def upload_syllabus_file(
 async def get_syllabus(syllabus_id: str):
     """
     Get a syllabus by ID
+    
+    Reads go through storage's stamped store cache, so a syllabus written or
+    deleted by another worker is seen on the next request.
     """
     syllabus_dict = storage.get_item(SYLLABI_STORE, syllabus_id)
     if not syllabus_dict:
@@ -140,17 +167,27 @@ async def get_syllabus(syllabus_id: str):
             detail=f"Syllabus with ID {syllabus_id} not found"
         )
     
-    return Syllabus(**syllabus_dict)
+    # Stored syllabi were produced by model_dump(), so they are served as-is
+    return ORJSONResponse(syllabus_dict)
 
 
 @router.get("/", response_model=list[Syllabus])
-async def list_syllabi():
+async def list_syllabi(
+    limit: Optional[int] = Query(None, ge=0, description="Return at most this many syllabi")
+):
     """
     List all syllabi
+    
+    Stored syllabi were produced by model_dump(), so they are returned as-is
+    instead of being re-validated through Syllabus. The total is always sent
+    in X-Total-Count, so limit=0 is a cheap count.
     """
-    syllabi_dict = storage.list_items(SYLLABI_STORE)
-    logger.info(f"Listing syllabi - found {len(syllabi_dict)} syllabi in storage")
-    return [Syllabus(**syl) for syl in syllabi_dict.values()]
+    syllabi = list(storage.list_items(SYLLABI_STORE).values())
+    total = len(syllabi)
+    logger.info(f"Listing syllabi - found {total} syllabi")
+    if limit is not None:
+        syllabi = syllabi[:limit]
+    return ORJSONResponse(syllabi, headers={"X-Total-Count": str(total)})
 
 
 @router.delete("/{syllabus_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -165,6 +202,11 @@ async def delete_syllabus(syllabus_id: str):
             detail=f"Syllabus with ID {syllabus_id} not found"
         )
     
-    storage.delete_item(SYLLABI_STORE, syllabus_id)
+    if not storage.delete_item(SYLLABI_STORE, syllabus_id):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete syllabus {syllabus_id}"
+        )
+    
     logger.info(f"✓ Deleted syllabus: {syllabus_id}")
     return None
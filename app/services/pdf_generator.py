@@ -5,121 +5,257 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib import colors
+from collections import defaultdict
 from io import BytesIO
 from datetime import datetime
-from typing import List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, BinaryIO, Optional
+import html
 import logging
+import os
+
+import anyio
 
 from app.models.schemas import QuestionPaper, Question, QuestionType
 
 logger = logging.getLogger(__name__)
 
 
+# Style colors, parsed once
+_COLOR_TITLE = colors.HexColor('#1a1a1a')
+_COLOR_HEADING = colors.HexColor('#2c3e50')
+_COLOR_OPTION = colors.HexColor('#34495e')
+_COLOR_ANSWER = colors.HexColor('#27ae60')
+_COLOR_INFO = colors.HexColor('#7f8c8d')
+_COLOR_TABLE_HEADER = colors.HexColor('#e0e0e0')
+_COLOR_GRID = colors.HexColor('#cccccc')
+_COLOR_BOX = colors.HexColor('#000000')
+
+# Layout dimensions and spacers, computed once (spacers are reused across stories)
+_MARGIN = 0.75*inch
+_INFO_COL_WIDTHS = (2*inch, 4*inch)
+_QUESTION_COL_WIDTHS = (0.5*inch, 5*inch, 0.6*inch, 0.6*inch)
+_SPACER_SMALL = Spacer(1, 0.05*inch)
+_SPACER_MEDIUM = Spacer(1, 0.1*inch)
+_SPACER_LARGE = Spacer(1, 0.3*inch)
+
+# Table styles shared by every table of the same kind
+_INFO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('TEXTCOLOR', (0, 0), (0, -1), _COLOR_HEADING),
+    ('TEXTCOLOR', (1, 0), (1, -1), _COLOR_OPTION),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+_HEADER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), _COLOR_TABLE_HEADER),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, _COLOR_GRID),
+    ('BOX', (0, 0), (-1, -1), 1, _COLOR_BOX),
+])
+_QUESTION_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('ALIGN', (2, 0), (2, -1), 'CENTER'),
+    ('ALIGN', (3, 0), (3, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (2, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, _COLOR_GRID),
+    ('BOX', (0, 0), (-1, -1), 1, _COLOR_BOX),
+])
+
+# ReportLab rendering is CPU-bound; cap concurrent renders at the core count
+# so they can't exhaust the shared threadpool. Created lazily because anyio
+# limiters need a running event loop.
+_render_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def _get_render_limiter() -> anyio.CapacityLimiter:
+    """Get the limiter for concurrent PDF renders"""
+    global _render_limiter
+    if _render_limiter is None:
+        _render_limiter = anyio.CapacityLimiter(os.cpu_count() or 1)
+    return _render_limiter
+
+
+# Section titles per question type
+_TYPE_NAMES = MappingProxyType({
+    'multiple_choice': 'Multiple Choice Questions',
+    'short_answer': 'Short Answer Questions',
+    'descriptive': 'Descriptive Questions',
+    'essay': 'Essay Questions',
+    'true_false': 'True/False Questions',
+    'fill_blank': 'Fill in the Blanks'
+})
+
+
+@lru_cache(maxsize=1024)
+def _format_generated_at(generated_at: datetime) -> str:
+    """Format a generation timestamp for the PDF header"""
+    return generated_at.strftime('%B %d, %Y at %I:%M %p')
+
+
 class PDFGenerator:
     """Generate PDF for question papers"""
     
+    # Stylesheet shared by every instance, built on first use
+    _STYLES = None
+    
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        self.styles = type(self)._build_styles()
     
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles"""
+    @classmethod
+    def _build_styles(cls):
+        """Build the sample stylesheet plus custom paragraph styles once per process"""
+        if cls._STYLES is not None:
+            return cls._STYLES
+        
+        styles = getSampleStyleSheet()
+        
         # Title style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomTitle',
-            parent=self.styles['Title'],
+            parent=styles['Title'],
             fontSize=18,
-            textColor=colors.HexColor('#1a1a1a'),
+            textColor=_COLOR_TITLE,
             spaceAfter=12,
             alignment=TA_CENTER,
             fontName='Helvetica-Bold'
         ))
         
         # Heading style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomHeading',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=14,
-            textColor=colors.HexColor('#2c3e50'),
+            textColor=_COLOR_HEADING,
             spaceAfter=10,
             spaceBefore=10,
             fontName='Helvetica-Bold'
         ))
         
         # Question style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='Question',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=11,
-            textColor=colors.HexColor('#1a1a1a'),
+            textColor=_COLOR_TITLE,
             spaceAfter=6,
             alignment=TA_JUSTIFY,
             fontName='Helvetica'
         ))
         
         # Option style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='Option',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
-            textColor=colors.HexColor('#34495e'),
+            textColor=_COLOR_OPTION,
             leftIndent=20,
             spaceAfter=3,
             fontName='Helvetica'
         ))
         
         # Answer style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='Answer',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
-            textColor=colors.HexColor('#27ae60'),
+            textColor=_COLOR_ANSWER,
             leftIndent=20,
             spaceAfter=6,
             fontName='Helvetica-Oblique'
         ))
         
         # Info style
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='Info',
-            parent=self.styles['Normal'],
+            parent=styles['Normal'],
             fontSize=10,
-            textColor=colors.HexColor('#7f8c8d'),
+            textColor=_COLOR_INFO,
             alignment=TA_CENTER,
             spaceAfter=8,
             fontName='Helvetica'
         ))
+        
+        cls._STYLES = styles
+        return styles
     
-    def generate_pdf(self, question_paper: QuestionPaper, include_answers: bool = None) -> BytesIO:
+    def generate_pdf(
+        self,
+        question_paper: QuestionPaper,
+        include_answers: bool = None,
+        output: Optional[BinaryIO] = None
+    ) -> BinaryIO:
         """
         Generate PDF for a question paper
         
         Args:
             question_paper: QuestionPaper object
             include_answers: Override for including answers (uses generation_rules if None)
+            output: Writable binary file-like target (a new BytesIO if None)
             
         Returns:
-            BytesIO object containing PDF data
+            The output object, rewound to the start when seekable
         """
         logger.info(f"Generating PDF for question paper: {question_paper.id}")
         
-        # Determine if answers should be included
-        show_answers = include_answers if include_answers is not None else question_paper.generation_rules.include_answer_key
+        buffer = self._build_document(self._build_story(question_paper, include_answers), output)
         
-        # Create buffer
-        buffer = BytesIO()
+        logger.info(f"✓ PDF generated successfully for {question_paper.id}")
+        return buffer
+    
+    def generate_multi(
+        self,
+        question_papers: List[QuestionPaper],
+        include_answers: bool = None,
+        output: Optional[BinaryIO] = None
+    ) -> BinaryIO:
+        """
+        Generate one PDF holding several question papers, each starting on a new page
         
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=0.75*inch,
-            bottomMargin=0.75*inch
-        )
+        Args:
+            question_papers: QuestionPaper objects in output order
+            include_answers: Override for including answers (uses each paper's generation_rules if None)
+            output: Writable binary file-like target (a new BytesIO if None)
+            
+        Returns:
+            The output object, rewound to the start when seekable
+        """
+        logger.info(f"Generating combined PDF for {len(question_papers)} question papers")
+        
+        story = []
+        for i, question_paper in enumerate(question_papers):
+            if i:
+                story.append(PageBreak())
+            story.extend(self._build_story(question_paper, include_answers))
+        buffer = self._build_document(story, output)
+        
+        logger.info(f"✓ Combined PDF generated for {len(question_papers)} question papers")
+        return buffer
+    
+    def _build_story(self, question_paper: QuestionPaper, include_answers: Optional[bool]) -> List:
+        """Build the flowables for one question paper"""
+        # Determine if answers should be included
+        show_answers = include_answers if include_answers is not None else question_paper.generation_rules.include_answer_key
         
         # Build content
         story = []
@@ -133,15 +269,54 @@ class PDFGenerator:
         # Questions
         story.extend(self._build_questions(question_paper, show_answers))
         
+        return story
+    
+    def _build_document(self, story: List, output: Optional[BinaryIO]) -> BinaryIO:
+        """Lay out the flowables as an A4 PDF into output (a new BytesIO if None)"""
+        # Create buffer
+        buffer = output if output is not None else BytesIO()
+        
+        # Create PDF document
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=_MARGIN,
+            leftMargin=_MARGIN,
+            topMargin=_MARGIN,
+            bottomMargin=_MARGIN
+        )
+        
         # Build PDF
         doc.build(story)
         
         # Reset buffer position
-        buffer.seek(0)
+        if buffer.seekable():
+            buffer.seek(0)
         
-        logger.info(f"✓ PDF generated successfully for {question_paper.id}")
         return buffer
     
+    async def generate_pdf_async(
+        self,
+        question_paper: QuestionPaper,
+        include_answers: bool = None,
+        output: Optional[BinaryIO] = None
+    ) -> BinaryIO:
+        """
+        Generate PDF in a worker thread so the event loop stays responsive
+        
+        Args:
+            question_paper: QuestionPaper object
+            include_answers: Override for including answers (uses generation_rules if None)
+            output: Writable binary file-like target (a new BytesIO if None)
+            
+        Returns:
+            The output object, rewound to the start when seekable
+        """
+        return await anyio.to_thread.run_sync(
+            self.generate_pdf, question_paper, include_answers, output,
+            limiter=_get_render_limiter()
+        )
+    
     def _build_header(self, question_paper: QuestionPaper) -> List:
         """Build PDF header section"""
         story = []
@@ -149,29 +324,21 @@ class PDFGenerator:
         # Title
         title = Paragraph(question_paper.course_name, self.styles['CustomTitle'])
         story.append(title)
-        story.append(Spacer(1, 0.1*inch))
+        story.append(_SPACER_MEDIUM)
         
         # Info table
         info_data = [
             ['Question Paper ID:', question_paper.id],
             ['Total Marks:', str(question_paper.total_marks)],
             ['Total Questions:', str(question_paper.total_questions)],
-            ['Generated On:', question_paper.generated_at.strftime('%B %d, %Y at %I:%M %p')]
+            ['Generated On:', _format_generated_at(question_paper.generated_at)]
         ]
         
-        info_table = Table(info_data, colWidths=[2*inch, 4*inch])
-        info_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#2c3e50')),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#34495e')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        info_table = Table(info_data, colWidths=_INFO_COL_WIDTHS)
+        info_table.setStyle(_INFO_TABLE_STYLE)
         
         story.append(info_table)
-        story.append(Spacer(1, 0.3*inch))
+        story.append(_SPACER_LARGE)
         
         return story
     
@@ -195,7 +362,7 @@ class PDFGenerator:
             p = Paragraph(f"• {instruction}", self.styles['Normal'])
             story.append(p)
         
-        story.append(Spacer(1, 0.3*inch))
+        story.append(_SPACER_LARGE)
         
         return story
     
@@ -204,12 +371,17 @@ class PDFGenerator:
         story = []
         
         # Group questions by type
-        questions_by_type = {}
+        questions_by_type = defaultdict(list)
         for question in question_paper.questions:
-            q_type = question.type.value
-            if q_type not in questions_by_type:
-                questions_by_type[q_type] = []
-            questions_by_type[q_type].append(question)
+            questions_by_type[question.type.value].append(question)
+        
+        # Table header row, identical for every section
+        header_data = [[
+            Paragraph('<b>Q. No.</b>', self.styles['Normal']),
+            Paragraph('<b>Questions</b>', self.styles['Normal']),
+            Paragraph('<b>CO</b>', self.styles['Normal']),
+            Paragraph('<b>BL</b>', self.styles['Normal'])
+        ]]
         
         # Render each group
         question_number = 1
@@ -218,31 +390,11 @@ class PDFGenerator:
             section_title = self._get_section_title(q_type, len(questions), questions[0].marks)
             heading = Paragraph(section_title, self.styles['CustomHeading'])
             story.append(heading)
-            story.append(Spacer(1, 0.1*inch))
+            story.append(_SPACER_MEDIUM)
             
             # Add table header
-            header_data = [[
-                Paragraph('<b>Q. No.</b>', self.styles['Normal']),
-                Paragraph('<b>Questions</b>', self.styles['Normal']),
-                Paragraph('<b>CO</b>', self.styles['Normal']),
-                Paragraph('<b>BL</b>', self.styles['Normal'])
-            ]]
-            
-            col_widths = [0.5*inch, 5*inch, 0.6*inch, 0.6*inch]
-            header_table = Table(header_data, colWidths=col_widths)
-            header_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#e0e0e0')),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
-                ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#000000')),
-            ]))
+            header_table = Table(header_data, colWidths=_QUESTION_COL_WIDTHS)
+            header_table.setStyle(_HEADER_TABLE_STYLE)
             
             story.append(header_table)
             
@@ -255,16 +407,7 @@ class PDFGenerator:
     
     def _get_section_title(self, question_type: str, count: int, marks: int) -> str:
         """Get formatted section title"""
-        type_names = {
-            'multiple_choice': 'Multiple Choice Questions',
-            'short_answer': 'Short Answer Questions',
-            'descriptive': 'Descriptive Questions',
-            'essay': 'Essay Questions',
-            'true_false': 'True/False Questions',
-            'fill_blank': 'Fill in the Blanks'
-        }
-        
-        type_name = type_names.get(question_type, question_type.replace('_', ' ').title())
+        type_name = _TYPE_NAMES.get(question_type) or question_type.replace('_', ' ').title()
         return f"{type_name} ({count} × {marks} marks)"
     
     def _render_question(self, question: Question, number: int, show_answers: bool) -> List:
@@ -272,16 +415,15 @@ class PDFGenerator:
         story = []
         
         # Build question text with options
-        q_text = f"{self._escape_html(question.question_text)}"
+        parts = [self._escape_html(question.question_text)]
         
         # Add options for MCQ/True-False
         if question.options:
-            q_text += "<br/>"
-            for option in question.options:
-                q_text += f"<br/>{self._escape_html(option)}"
+            parts.append("<br/>")
+            parts.extend(f"<br/>{self._escape_html(option)}" for option in question.options)
         
         # Create question paragraph
-        question_para = Paragraph(q_text, self.styles['Question'])
+        question_para = Paragraph("".join(parts), self.styles['Question'])
         
         # Get CO and BL values
         co_value = question.course_outcome or 'CO1'
@@ -298,35 +440,20 @@ class PDFGenerator:
         ]
         
         # Create table
-        col_widths = [0.5*inch, 5*inch, 0.6*inch, 0.6*inch]
-        question_table = Table(table_data, colWidths=col_widths)
-        question_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('ALIGN', (2, 0), (2, -1), 'CENTER'),
-            ('ALIGN', (3, 0), (3, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (2, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#000000')),
-        ]))
+        question_table = Table(table_data, colWidths=_QUESTION_COL_WIDTHS)
+        question_table.setStyle(_QUESTION_TABLE_STYLE)
         
         story.append(question_table)
         
         # Answer (if enabled)
         if show_answers and question.correct_answer:
-            answer_text = f"<b>Answer:</b> {self._escape_html(question.correct_answer)}"
+            answer_parts = ["<b>Answer:</b> ", self._escape_html(question.correct_answer)]
             if question.answer_explanation:
-                answer_text += f" - {self._escape_html(question.answer_explanation)}"
+                answer_parts.append(" - ")
+                answer_parts.append(self._escape_html(question.answer_explanation))
             
-            answer_para = Paragraph(answer_text, self.styles['Answer'])
-            story.append(Spacer(1, 0.05*inch))
+            answer_para = Paragraph("".join(answer_parts), self.styles['Answer'])
+            story.append(_SPACER_SMALL)
             story.append(answer_para)
         
         return story
@@ -336,14 +463,16 @@ class PDFGenerator:
         if not text:
             return ""
         
-        text = str(text)
-        replacements = {
-            '&': '&amp;',
-            '<': '&lt;',
-            '>': '&gt;',
-        }
-        
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-        
-        return text
+        return html.escape(str(text), quote=False)
+
+
+# Global PDF generator instance
+_pdf_generator_instance: Optional[PDFGenerator] = None
+
+
+def get_pdf_generator() -> PDFGenerator:
+    """Get or create global PDF generator instance"""
+    global _pdf_generator_instance
+    if _pdf_generator_instance is None:
+        _pdf_generator_instance = PDFGenerator()
+    return _pdf_generator_instance
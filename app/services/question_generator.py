@@ -2,11 +2,18 @@
 Question Generator Service
 Uses Google Gemini to generate questions based on syllabus
 """
+import asyncio
+import hashlib
 import logging
-import json
-import uuid
-from typing import List, Dict
+import random
+import re
+import secrets
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import List, Dict, Optional
 import google.generativeai as genai
+import orjson
+from google.api_core import exceptions as google_exceptions
 
 from app.models import (
     Syllabus,
@@ -17,9 +24,170 @@ from app.models import (
     Unit
 )
 from app.config import settings
+from app.utils.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+_RNG = random.Random()
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Gemini errors worth another attempt; other API errors (bad request,
+# permission, ...) fail the same way every time
+_RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
+
+
+_PROMPT_INTRO = """You are an expert educator creating exam questions for a course.
+
+REQUIREMENTS:
+- Question MUST be specific to the unit topics given below
+- Use clear, unambiguous language
+- Match the requested difficulty level
+- Test real understanding, not just recall"""
+
+# Static instructions and output format per question type. Kept free of any
+# per-call values so every prompt of a type shares the same prefix.
+_STATIC_PROMPTS = {
+    QuestionType.MULTIPLE_CHOICE: _PROMPT_INTRO + """
+- Create exactly 4 options (A, B, C, D)
+- Only ONE option should be correct
+- All distractors should be plausible but clearly wrong
+
+IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
+{
+  "question": "What is [specific concept] in [unit]?",
+  "options": [
+    "A) First option",
+    "B) Second option",
+    "C) Third option",
+    "D) Fourth option"
+  ],
+  "correct_answer": "A",
+  "explanation": "Why A is correct (1-3 sentences)",
+  "course_outcome": "CO1",
+  "blooms_level": "K1"
+}""",
+    QuestionType.TRUE_FALSE: _PROMPT_INTRO + """
+- Create a clear statement about a specific concept
+- Statement should be clearly true OR clearly false
+
+IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
+{
+  "question": "Specific statement about the topic",
+  "options": ["True", "False"],
+  "correct_answer": "True",
+  "explanation": "Why this statement is true/false",
+  "course_outcome": "CO1",
+  "blooms_level": "K1"
+}""",
+    QuestionType.SHORT_ANSWER: _PROMPT_INTRO + """
+- Question should have 2-4 key points in the answer
+
+IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
+{
+  "question": "Specific question about [unit] concepts?",
+  "correct_answer": "Key points: 1) point one 2) point two 3) point three",
+  "explanation": "Marking scheme: 1 mark per key point",
+  "course_outcome": "CO2",
+  "blooms_level": "K2"
+}""",
+    QuestionType.DESCRIPTIVE: _PROMPT_INTRO + """
+- Should test deep understanding and ability to elaborate
+
+IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
+{
+  "question": "Explain/Describe/Analyze [specific aspect of unit] in detail.",
+  "correct_answer": "Expected answer structure with key points",
+  "explanation": "Marking scheme: marks for each major point",
+  "course_outcome": "CO3",
+  "blooms_level": "K3"
+}""",
+    QuestionType.ESSAY: _PROMPT_INTRO + """
+- Should allow student to demonstrate broad understanding
+
+IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
+{
+  "question": "Comprehensive question about [unit] requiring essay-type answer.",
+  "correct_answer": "Structure: Introduction, main points, examples, conclusion",
+  "explanation": "Marking scheme breakdown",
+  "course_outcome": "CO4",
+  "blooms_level": "K4"
+}""",
+    QuestionType.FILL_BLANK: _PROMPT_INTRO + """
+
+IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
+{
+  "question": "Statement with _____ blank to fill",
+  "correct_answer": "word or phrase for blank",
+  "explanation": "Why this is the answer",
+  "course_outcome": "CO1",
+  "blooms_level": "K1"
+}""",
+}
+
+# Per-call tail of every prompt; {marks} etc. are filled by _create_prompt
+_PROMPT_TAIL = """
+
+UNIT: {unit_title}
+TOPICS TO COVER:
+- {topics}
+
+TASK: Create {task_count} {difficulty} difficulty %s question{plural} worth {marks} marks{each}.
+- Appropriate difficulty for {difficulty} level"""
+
+_MARKS_HINTS = {
+    QuestionType.MULTIPLE_CHOICE: "\n- {marks}-mark questions should test application/analysis (CO2, K2)",
+    QuestionType.SHORT_ANSWER: "\n- {marks}-mark questions should require brief explanation",
+    QuestionType.DESCRIPTIVE: "\n- {marks}-mark questions need detailed explanation",
+    QuestionType.ESSAY: "\n- {marks}-mark questions require comprehensive answer",
+}
+_MCQ_ONE_MARK_HINT = "\n- 1-mark questions should test recall or basic understanding (CO1, K1)"
+
+
+def _build_prompt_template(question_type: QuestionType, marks_hint: str) -> str:
+    """Join a type's static block, the dynamic tail and its marks hint into one format string"""
+    static = _STATIC_PROMPTS[question_type].replace("{", "{{").replace("}", "}}")
+    return static + _PROMPT_TAIL % question_type.value.replace('_', ' ') + marks_hint
+
+
+# Complete prompt per question type, so building one is a lookup and a format()
+_PROMPT_TEMPLATES = {
+    question_type: _build_prompt_template(question_type, _MARKS_HINTS.get(question_type, ""))
+    for question_type in _STATIC_PROMPTS
+}
+_MCQ_ONE_MARK_TEMPLATE = _build_prompt_template(QuestionType.MULTIPLE_CHOICE, _MCQ_ONE_MARK_HINT)
+
+# Fallback course outcome / Bloom's level by marks (index = marks, clipped)
+_CO_BL_MAX_MARKS = 6
+_CO_BL_BY_MARKS = tuple(
+    ("CO1", "K1") if m <= 1 else ("CO2", "K2") if m <= 3 else ("CO3", "K3") if m <= 5 else ("CO4", "K4")
+    for m in range(_CO_BL_MAX_MARKS + 1)
+)
+
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter before retrying a transient Gemini error"""
+    return 0.5 * 2 ** attempt + _RNG.random() * 0.25
+
+
+@lru_cache(maxsize=1024)
+def _topics_block(title: str, topics: tuple) -> str:
+    """Bullet list of a unit's first topics for prompts (the title if it has none)"""
+    return "\n- ".join(topics or (title,))
+
+
+def _unit_terms(unit: Unit) -> frozenset:
+    """Lower-cased word set of a unit's title and topics"""
+    return frozenset(_WORD_RE.findall(f"{unit.title} {' '.join(unit.topics)}".lower()))
+
 
 class QuestionGenerator:
     """Generate questions using Google Gemini AI"""
@@ -27,8 +195,29 @@ class QuestionGenerator:
     def __init__(self):
         """Initialize Gemini AI"""
         try:
+            # Keep the default transport: async calls then go through the SDK's
+            # cached GenerativeServiceAsyncClient, i.e. one long-lived gRPC
+            # (HTTP/2) channel that multiplexes every request instead of opening
+            # a TLS connection per call. transport="rest" would break the async
+            # client in this SDK version.
             genai.configure(api_key=settings.GEMINI_API_KEY)
             self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+            # Bounds concurrent Gemini calls (streams on the shared channel) to
+            # stay within rate limits
+            self._semaphore = asyncio.Semaphore(settings.GEMINI_CONCURRENCY)
+            # Settings never change at runtime, so generation configs are built
+            # once (batch configs per question count, on first use)
+            self._generation_config = genai.types.GenerationConfig(
+                temperature=settings.GEMINI_TEMPERATURE,
+                max_output_tokens=settings.GEMINI_MAX_TOKENS or 1024,
+            )
+            self._batch_generation_configs: Dict[int, genai.types.GenerationConfig] = {}
+            # Parsed responses by input hash; values are never mutated
+            self._response_cache = LRUCache(maxsize=2048)
+            # Recent questions per (type, marks, difficulty) for similar-unit reuse
+            self._similar_cache = defaultdict(lambda: deque(maxlen=256))
+            # Fallback question fields by unit/kind, reused during API outages
+            self._fallback_cache = LRUCache(maxsize=1024)
             logger.info("Gemini AI initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Gemini AI: {e}")
@@ -55,25 +244,32 @@ class QuestionGenerator:
             # Calculate distribution
             distribution = self._calculate_distribution(syllabus.units, rules)
             
-            # Generate questions for each unit and type
+            # Generate questions for each unit and type concurrently,
+            # batching all questions of one type for a unit into one call
+            units_by_id = {u.id: u for u in syllabus.units}
+            tasks = []
             for unit_id, type_counts in distribution.items():
-                unit = next(u for u in syllabus.units if u.id == unit_id)
+                unit = units_by_id[unit_id]
                 
                 for question_type, config in type_counts.items():
-                    for _ in range(config['count']):
-                        question = await self._generate_single_question(
-                            unit=unit,
-                            marks=config['marks'],
-                            question_type=question_type,
-                            difficulty=config['difficulty']
-                        )
-                        if question:
-                            questions.append(question)
+                    tasks.append(self._generate_batch(
+                        unit=unit,
+                        marks=config['marks'],
+                        question_type=question_type,
+                        difficulty=config['difficulty'],
+                        count=config['count']
+                    ))
             
-            # Randomize if requested
+            # A failed task fails the whole request rather than returning a
+            # paper that is short of the requested questions
+            for result in await asyncio.gather(*tasks):
+                questions.extend(q for q in result if q)
+            
+            # Randomize if requested (a seeded order gets its own generator so
+            # concurrent requests don't reseed the shared one)
             if rules.randomize_order:
-                import random
-                random.shuffle(questions)
+                rng = _RNG if rules.shuffle_seed is None else random.Random(rules.shuffle_seed)
+                rng.shuffle(questions)
             
             logger.info(f"Generated {len(questions)} questions")
             return questions
@@ -93,23 +289,23 @@ class QuestionGenerator:
         Returns:
             Dict with structure: {unit_id: {question_type: {marks, count, difficulty}}}
         """
-        distribution = {}
         num_units = len(units)
         
-        for qt_config in rules.question_types:
-            # Distribute evenly across units
-            base_count = qt_config.count // num_units
-            remainder = qt_config.count % num_units
-            
-            for i, unit in enumerate(units):
-                if unit.id not in distribution:
-                    distribution[unit.id] = {}
-                
+        # Distribute evenly across units: (config, base count, remainder)
+        shares = [
+            (qt_config, *divmod(qt_config.count, num_units))
+            for qt_config in rules.question_types
+        ]
+        
+        distribution = {unit.id: {} for unit in units}
+        for i, unit in enumerate(units):
+            unit_types = distribution[unit.id]
+            for qt_config, base_count, remainder in shares:
                 # Add extra question to first units to handle remainder
-                count = base_count + (1 if i < remainder else 0)
+                count = base_count + (i < remainder)
                 
                 if count > 0:
-                    distribution[unit.id][qt_config.type] = {
+                    unit_types[qt_config.type] = {
                         'marks': qt_config.marks,
                         'count': count,
                         'difficulty': qt_config.difficulty or DifficultyLevel.MEDIUM
@@ -122,7 +318,8 @@ class QuestionGenerator:
         unit: Unit,
         marks: int,
         question_type: QuestionType,
-        difficulty: DifficultyLevel
+        difficulty: DifficultyLevel,
+        use_cache: bool = True
     ) -> Question:
         """
         Generate a single question using Gemini
@@ -132,74 +329,326 @@ class QuestionGenerator:
             marks: Marks for the question
             question_type: Type of question
             difficulty: Difficulty level
+            use_cache: Reuse/store the response for identical inputs
             
         Returns:
             Generated question
         """
+        cache_key = self._cache_key(unit, marks, question_type, difficulty, 1)
+        cached = self._response_cache.get(cache_key) if use_cache else None
+        if cached is not None:
+            logger.debug("Using cached %s question for unit '%s'", question_type.value, unit.title)
+            return self._build_question(unit, marks, question_type, difficulty, cached[0])
+        
+        if use_cache and settings.SEMANTIC_CACHE:
+            similar = self._find_similar(unit, marks, question_type, difficulty)
+            if similar is not None:
+                question = self._try_build_question(unit, marks, question_type, difficulty, similar)
+                if question is not None:
+                    logger.debug("Reusing a similar unit's %s question for '%s'", question_type.value, unit.title)
+                    return question
+        
+        async with self._semaphore:
+            question_data = await self._generate_with_retries(unit, marks, question_type, difficulty)
+        
+        if question_data is None:
+            # Only use fallback after all retries exhausted
+            logger.error(f"All retries exhausted, using fallback question for {unit.title}")
+            return self._create_fallback_question(unit, marks, question_type, difficulty)
+        
+        question = self._try_build_question(unit, marks, question_type, difficulty, question_data)
+        if question is None:
+            logger.error(f"Generated question did not validate, using fallback question for {unit.title}")
+            return self._create_fallback_question(unit, marks, question_type, difficulty)
+        
+        # Only output that built a valid Question is cached
+        if use_cache:
+            self._response_cache.set(cache_key, [question_data])
+            if settings.SEMANTIC_CACHE:
+                self._similar_cache[(question_type, marks, difficulty)].append(
+                    (_unit_terms(unit), unit.title, question_data)
+                )
+        
+        logger.info("✓ Successfully generated %s question: %.60s...", question_type.value, question.question_text)
+        return question
+    
+    async def _generate_with_retries(
+        self,
+        unit: Unit,
+        marks: int,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel
+    ) -> Optional[Dict]:
+        """Call Gemini with retries and return the parsed question data (None if every attempt failed)"""
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 # Create prompt based on question type
                 prompt = self._create_prompt(unit, marks, question_type, difficulty)
                 
-                logger.debug(f"Generating {question_type.value} question for unit '{unit.title}' (attempt {attempt + 1}/{max_retries})")
+                logger.debug("Generating %s question for unit '%s' (attempt %d/%d)", question_type.value, unit.title, attempt + 1, max_retries)
                 
-                # Generate with Gemini - note: this is synchronous, not async
-                response = self.model.generate_content(
+                # Generate with Gemini without blocking the event loop
+                response = await self.model.generate_content_async(
                     prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=settings.GEMINI_TEMPERATURE,
-                        max_output_tokens=settings.GEMINI_MAX_TOKENS or 1024,
-                    )
+                    generation_config=self._generation_config
                 )
                 
-                # Check if response was blocked or empty
+                # A blocked prompt is blocked on every attempt
+                if response and response.prompt_feedback.block_reason:
+                    logger.warning(f"Prompt blocked by Gemini ({response.prompt_feedback.block_reason}), not retrying")
+                    return None
+                
+                # Check if response was empty
                 if not response or not response.text:
                     logger.warning(f"Empty response from Gemini (attempt {attempt + 1})")
-                    if attempt < max_retries - 1:
-                        continue
-                    raise ValueError("Gemini returned empty response")
+                    continue
                 
-                logger.debug(f"Gemini response: {response.text[:200]}...")
+                logger.debug("Gemini response: %.200s...", response.text)
                 
                 # Parse response
                 question_data = self._parse_response(response.text, question_type)
                 
                 # Validate question data
-                if not question_data.get('question') or len(question_data.get('question', '')) < 10:
+                if not self._is_valid_question_data(question_data):
                     logger.warning(f"Invalid question data received (attempt {attempt + 1})")
-                    if attempt < max_retries - 1:
-                        continue
-                    raise ValueError("Invalid question generated")
+                    continue
+                
+                return question_data
                 
-                # Create Question object
-                question = Question(
-                    id=f"q_{uuid.uuid4().hex[:8]}",
-                    unit_id=unit.id,
-                    unit_name=unit.title,
-                    question_text=question_data.get('question', ''),
-                    marks=marks,
-                    type=question_type,
-                    difficulty=difficulty,
-                    options=question_data.get('options'),
-                    correct_answer=question_data.get('correct_answer'),
-                    answer_explanation=question_data.get('explanation'),
-                    course_outcome=question_data.get('course_outcome', 'CO1'),
-                    blooms_level=question_data.get('blooms_level', 'K1')
+            except _RETRYABLE_ERRORS as e:
+                logger.warning(f"Transient Gemini error (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt + 1 < max_retries:
+                    await asyncio.sleep(_retry_delay(attempt))
+            except google_exceptions.GoogleAPICallError as e:
+                logger.error(f"Non-retryable Gemini error: {e}")
+                return None
+            except Exception as e:
+                # Malformed or incomplete output usually succeeds on resampling
+                logger.error(f"Error generating question (attempt {attempt + 1}/{max_retries}): {e}")
+        
+        return None
+    
+    async def _generate_batch(
+        self,
+        unit: Unit,
+        marks: int,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel,
+        count: int
+    ) -> List[Question]:
+        """
+        Generate several questions of the same kind with a single Gemini call
+        
+        Falls back to one call per question for anything the batch didn't return.
+        
+        Args:
+            unit: Unit to generate questions for
+            marks: Marks for each question
+            question_type: Type of question
+            difficulty: Difficulty level
+            count: Number of questions to generate
+            
+        Returns:
+            List of generated questions
+        """
+        if count == 1:
+            return [await self._generate_single_question(unit, marks, question_type, difficulty)]
+        
+        # Whole batches are cached so one paper never repeats a cached question
+        cache_key = self._cache_key(unit, marks, question_type, difficulty, count)
+        items = self._response_cache.get(cache_key)
+        cached = items is not None
+        if cached:
+            logger.debug("Using cached batch of %d %s questions for unit '%s'", count, question_type.value, unit.title)
+        else:
+            async with self._semaphore:
+                items = await self._request_batch(unit, marks, question_type, difficulty, count)
+        
+        questions = [
+            question for question in (
+                self._try_build_question(unit, marks, question_type, difficulty, data)
+                for data in items
+            )
+            if question is not None
+        ]
+        
+        # Only complete batches that all built valid Questions are cached
+        if not cached and len(questions) == count:
+            self._response_cache.set(cache_key, items)
+        
+        missing = count - len(questions)
+        if missing > 0:
+            logger.warning(f"Batch for '{unit.title}' returned {len(questions)}/{count} questions, generating {missing} individually")
+            questions.extend(await asyncio.gather(*(
+                self._generate_single_question(unit, marks, question_type, difficulty, use_cache=False)
+                for _ in range(missing)
+            )))
+        
+        return questions
+    
+    async def _request_batch(
+        self,
+        unit: Unit,
+        marks: int,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel,
+        count: int
+    ) -> List[Dict]:
+        """Ask Gemini for a JSON array of questions and return the valid items (empty if the call fails)"""
+        max_retries = 2
+        for attempt in range(max_retries):
+            try:
+                prompt = self._create_prompt(unit, marks, question_type, difficulty, count)
+                
+                logger.debug("Generating %d %s questions for unit '%s' (attempt %d/%d)", count, question_type.value, unit.title, attempt + 1, max_retries)
+                
+                response = await self.model.generate_content_async(
+                    prompt,
+                    generation_config=self._batch_generation_config(count)
                 )
                 
-                logger.info(f"✓ Successfully generated {question_type.value} question: {question.question_text[:60]}...")
-                return question
+                if response and response.prompt_feedback.block_reason:
+                    logger.warning(f"Batch prompt blocked by Gemini ({response.prompt_feedback.block_reason}), not retrying")
+                    return []
                 
+                if not response or not response.text:
+                    logger.warning(f"Empty batch response from Gemini (attempt {attempt + 1})")
+                    continue
+                
+                items = [
+                    data for data in self._parse_batch_response(response.text, question_type)
+                    if self._is_valid_question_data(data)
+                ][:count]
+                
+                logger.info("✓ Generated %d %s questions for '%s' in one call", len(items), question_type.value, unit.title)
+                return items
+                
+            except _RETRYABLE_ERRORS as e:
+                logger.warning(f"Transient Gemini error on batch (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt + 1 < max_retries:
+                    await asyncio.sleep(_retry_delay(attempt))
+            except google_exceptions.GoogleAPICallError as e:
+                logger.error(f"Non-retryable Gemini error on batch: {e}")
+                return []
             except Exception as e:
-                logger.error(f"Error generating question (attempt {attempt + 1}/{max_retries}): {e}")
-                if attempt == max_retries - 1:
-                    # Only use fallback after all retries exhausted
-                    logger.error(f"All retries exhausted, using fallback question for {unit.title}")
-                    return self._create_fallback_question(unit, marks, question_type, difficulty)
+                logger.error(f"Error generating question batch (attempt {attempt + 1}/{max_retries}): {e}")
+        
+        return []
+    
+    def _batch_generation_config(self, count: int) -> "genai.types.GenerationConfig":
+        """Generation config for a batch of count questions (output budget scaled by count)"""
+        config = self._batch_generation_configs.get(count)
+        if config is None:
+            config = self._batch_generation_configs[count] = genai.types.GenerationConfig(
+                temperature=settings.GEMINI_TEMPERATURE,
+                max_output_tokens=(settings.GEMINI_MAX_TOKENS or 1024) * count,
+            )
+        return config
+    
+    def _cache_key(
+        self,
+        unit: Unit,
+        marks: int,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel,
+        count: int
+    ) -> str:
+        """Hash the inputs that determine a Gemini response"""
+        payload = orjson.dumps({
+            'unit_id': unit.id,
+            'title': unit.title,
+            'topics': unit.topics,
+            'marks': marks,
+            'type': question_type.value,
+            'difficulty': difficulty.value,
+            'count': count,
+            'model': settings.GEMINI_MODEL
+        }, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+    
+    def _find_similar(
+        self,
+        unit: Unit,
+        marks: int,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel
+    ) -> Optional[Dict]:
+        """
+        Find a cached question from a unit with near-identical title/topics
+        
+        Units are compared by Jaccard similarity of their word sets; on a hit
+        the cached unit title is swapped for this unit's title.
+        
+        Returns:
+            Question data adapted to this unit, or None if nothing is close enough
+        """
+        terms = _unit_terms(unit)
+        if not terms:
+            return None
+        
+        for cached_terms, cached_title, question_data in reversed(self._similar_cache[(question_type, marks, difficulty)]):
+            similarity = len(terms & cached_terms) / len(terms | cached_terms)
+            if similarity >= settings.SEMANTIC_CACHE_THRESHOLD:
+                return {
+                    **question_data,
+                    'question': question_data['question'].replace(cached_title, unit.title)
+                }
+        return None
+    
+    def _is_valid_question_data(self, question_data: Dict) -> bool:
+        """Check that parsed question data has a usable question text"""
+        return isinstance(question_data, dict) and len(question_data.get('question') or '') >= 10
+    
+    def _build_question(
+        self,
+        unit: Unit,
+        marks: int,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel,
+        question_data: Dict
+    ) -> Question:
+        """Create a Question from parsed Gemini output"""
+        fields = dict(
+            id=f"q_{secrets.token_hex(4)}",
+            unit_id=unit.id,
+            unit_name=unit.title,
+            question_text=str(question_data.get('question', '')),
+            marks=marks,
+            type=question_type,
+            difficulty=difficulty,
+            options=question_data.get('options'),
+            correct_answer=question_data.get('correct_answer'),
+            answer_explanation=question_data.get('explanation'),
+            course_outcome=question_data.get('course_outcome', 'CO1'),
+            blooms_level=question_data.get('blooms_level', 'K1')
+        )
+        if not settings.TRUST_GENERATED_QUESTIONS:
+            return Question(**fields)
         
-        # This shouldn't be reached, but just in case
-        return self._create_fallback_question(unit, marks, question_type, difficulty)
+        # Skip validation, but coerce the model-written fields to the types the
+        # schema expects (e.g. a bare True for a true/false answer)
+        options = fields['options']
+        fields['options'] = [str(option) for option in options] if isinstance(options, list) else None
+        for name in ('correct_answer', 'answer_explanation', 'course_outcome', 'blooms_level'):
+            if fields[name] is not None:
+                fields[name] = str(fields[name])
+        return Question.model_construct(**fields)
+    
+    def _try_build_question(
+        self,
+        unit: Unit,
+        marks: int,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel,
+        question_data: Dict
+    ) -> Optional[Question]:
+        """Create a Question from parsed Gemini output (None if it fails validation)"""
+        try:
+            return self._build_question(unit, marks, question_type, difficulty, question_data)
+        except ValueError as e:
+            logger.warning(f"Discarding invalid {question_type.value} question for '{unit.title}': {e}")
+            return None
     
     def _create_fallback_question(
         self,
@@ -208,26 +657,36 @@ class QuestionGenerator:
         question_type: QuestionType,
         difficulty: DifficultyLevel
     ) -> Question:
-        """Create a fallback question when API fails"""
+        """Create a fallback question when API fails (built from trusted values, so not validated)"""
+        # Fallbacks are deterministic, so the fields are built once per kind
+        # and only the id is minted per question
+        cache_key = (unit.id, unit.title, tuple(unit.topics[:3]), marks, question_type, difficulty)
+        fields = self._fallback_cache.get(cache_key)
+        if fields is None:
+            fields = self._fallback_fields(unit, marks, question_type, difficulty)
+            self._fallback_cache.set(cache_key, fields)
+        
+        options = fields['options']
+        return Question.model_construct(
+            id=f"q_{secrets.token_hex(4)}",
+            **{**fields, 'options': list(options) if options else None}
+        )
+    
+    def _fallback_fields(
+        self,
+        unit: Unit,
+        marks: int,
+        question_type: QuestionType,
+        difficulty: DifficultyLevel
+    ) -> Dict:
+        """Build the fields of a fallback question (everything except its id)"""
         topics_str = ", ".join(unit.topics[:3]) if unit.topics else unit.title
         
-        # Determine CO and BL based on marks and type
-        if marks == 1:
-            co = "CO1"
-            bl = "K1"
-        elif marks <= 3:
-            co = "CO2"
-            bl = "K2"
-        elif marks <= 5:
-            co = "CO3"
-            bl = "K3"
-        else:
-            co = "CO4"
-            bl = "K4"
+        co, bl = _CO_BL_BY_MARKS[min(marks, _CO_BL_MAX_MARKS)]
         
         if question_type == QuestionType.MULTIPLE_CHOICE:
-            return Question(
-                id=f"q_{uuid.uuid4().hex[:8]}",
+            topics = unit.topics
+            return dict(
                 unit_id=unit.id,
                 unit_name=unit.title,
                 question_text=f"Which of the following is related to {unit.title}?",
@@ -235,8 +694,8 @@ class QuestionGenerator:
                 type=question_type,
                 difficulty=difficulty,
                 options=[
-                    f"A) {unit.topics[0] if unit.topics else 'Option A'}",
-                    f"B) {unit.topics[1] if len(unit.topics) > 1 else 'Option B'}",
+                    f"A) {topics[0] if topics else 'Option A'}",
+                    f"B) {topics[1] if len(topics) > 1 else 'Option B'}",
                     "C) None of the above",
                     "D) All of the above"
                 ],
@@ -246,14 +705,14 @@ class QuestionGenerator:
                 blooms_level=bl
             )
         else:
-            return Question(
-                id=f"q_{uuid.uuid4().hex[:8]}",
+            return dict(
                 unit_id=unit.id,
                 unit_name=unit.title,
                 question_text=f"Explain the key concepts covered in {unit.title}. Topics include: {topics_str}",
                 marks=marks,
                 type=question_type,
                 difficulty=difficulty,
+                options=None,
                 correct_answer=f"Students should explain: {topics_str}",
                 answer_explanation="This is a fallback question due to API error.",
                 course_outcome=co,
@@ -265,171 +724,51 @@ class QuestionGenerator:
         unit: Unit,
         marks: int,
         question_type: QuestionType,
-        difficulty: DifficultyLevel
+        difficulty: DifficultyLevel,
+        count: int = 1
     ) -> str:
-        """Create a prompt for Gemini based on question parameters"""
-        
-        # Get topics for this unit
-        topics_list = unit.topics[:5] if unit.topics else [unit.title]
-        topics_str = "\n- ".join(topics_list)
-        
-        base_prompt = f"""You are an expert educator creating exam questions for a course.
-
-UNIT: {unit.title}
-TOPICS TO COVER:
-- {topics_str}
-
-TASK: Create ONE {difficulty.value} difficulty {question_type.value.replace('_', ' ')} question worth {marks} marks.
-
-REQUIREMENTS:
-- Question MUST be specific to the topics listed above
-- Use clear, unambiguous language
-- Appropriate difficulty for {difficulty.value} level
-- Test real understanding, not just recall"""
-        
-        if question_type == QuestionType.MULTIPLE_CHOICE:
-            if marks == 1:
-                base_prompt += f"""
-- 1-mark questions should test recall or basic understanding
-- Create exactly 4 options (A, B, C, D)
-- Only ONE option should be correct
-- All distractors should be plausible but clearly wrong
-
-IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
-{{
-  "question": "What is [specific concept] in {unit.title}?",
-  "options": [
-    "A) First option",
-    "B) Second option",
-    "C) Third option", 
-    "D) Fourth option"
-  ],
-  "correct_answer": "A",
-  "explanation": "Why A is correct (1-2 sentences)",
-  "course_outcome": "CO1",
-  "blooms_level": "K1"
-}}"""
-            else:
-                base_prompt += f"""
-- {marks}-mark questions should test application/analysis
-- Create exactly 4 options (A, B, C, D)
-- Only ONE option should be correct
-
-IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
-{{
-  "question": "A specific scenario or problem related to {unit.title}",
-  "options": [
-    "A) First option",
-    "B) Second option",
-    "C) Third option",
-    "D) Fourth option"
-  ],
-  "correct_answer": "A",
-  "explanation": "Detailed explanation (2-3 sentences)",
-  "course_outcome": "CO2",
-  "blooms_level": "K2"
-}}"""
+        """
+        Create a prompt for Gemini based on question parameters (a JSON array when count > 1)
         
-        elif question_type == QuestionType.TRUE_FALSE:
-            base_prompt += """
-- Create a clear statement about a specific concept
-- Statement should be clearly true OR clearly false
-
-IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
-{
-  "question": "Specific statement about the topic",
-  "options": ["True", "False"],
-  "correct_answer": "True",
-  "explanation": "Why this statement is true/false",
-  "course_outcome": "CO1",
-  "blooms_level": "K1"
-}"""
+        The prompt starts with the byte-identical static block for the question
+        type so Gemini can reuse its cached prefix; only the tail varies per call.
+        """
+        if question_type == QuestionType.MULTIPLE_CHOICE and marks == 1:
+            template = _MCQ_ONE_MARK_TEMPLATE
+        else:
+            template = _PROMPT_TEMPLATES[question_type]
         
-        elif question_type == QuestionType.SHORT_ANSWER:
-            base_prompt += f"""
-- {marks}-mark questions should require brief explanation
-- Question should have 2-4 key points in the answer
-
-IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
-{{
-  "question": "Specific question about {unit.title} concepts?",
-  "correct_answer": "Key points: 1) point one 2) point two 3) point three",
-  "explanation": "Marking scheme: 1 mark per key point",
-  "course_outcome": "CO2",
-  "blooms_level": "K2"
-}}"""
+        prompt = template.format(
+            unit_title=unit.title,
+            topics=_topics_block(unit.title, tuple(unit.topics[:5])),
+            task_count="ONE" if count == 1 else f"exactly {count} distinct",
+            difficulty=difficulty.value,
+            plural="s" if count > 1 else "",
+            marks=marks,
+            each=" each" if count > 1 else ""
+        )
         
-        elif question_type == QuestionType.DESCRIPTIVE:
-            base_prompt += f"""
-- {marks}-mark questions need detailed explanation
-- Should test deep understanding and ability to elaborate
+        if count > 1:
+            prompt += f"""
 
-IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
-{{
-  "question": "Explain/Describe/Analyze [specific aspect of {unit.title}] in detail.",
-  "correct_answer": "Expected answer structure with key points",
-  "explanation": "Marking scheme: marks for each major point",
-  "course_outcome": "CO3",
-  "blooms_level": "K3"
-}}"""
-        
-        elif question_type == QuestionType.ESSAY:
-            base_prompt += f"""
-- {marks}-mark questions require comprehensive answer
-- Should allow student to demonstrate broad understanding
-
-IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
-{{
-  "question": "Comprehensive question about {unit.title} requiring essay-type answer.",
-  "correct_answer": "Structure: Introduction, main points, examples, conclusion",
-  "explanation": "Marking scheme breakdown",
-  "course_outcome": "CO4",
-  "blooms_level": "K4"
-}}"""
+Return a JSON array of exactly {count} objects, each in the format above (no extra text)."""
         
-        else:  # FILL_BLANK
-            base_prompt += """
-IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
-{
-  "question": "Statement with _____ blank to fill",
-  "correct_answer": "word or phrase for blank",
-  "explanation": "Why this is the answer",
-  "course_outcome": "CO1",
-  "blooms_level": "K1"
-}"""
-        
-        return base_prompt
+        return prompt
     
     def _parse_response(self, response_text: str, question_type: QuestionType) -> Dict:
         """Parse Gemini response into structured data"""
         try:
-            # Try to extract JSON from response
-            # Sometimes Gemini wraps JSON in markdown code blocks
-            json_str = response_text.strip()
-            
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_str:
-                # Try to find JSON in any code block
-                parts = json_str.split("```")
-                for i, part in enumerate(parts):
-                    if part.strip().startswith('{'):
-                        json_str = part.strip()
-                        break
-            
-            # Remove any leading/trailing whitespace and newlines
-            json_str = json_str.strip()
-            
-            # Try to find JSON object if mixed with other text
-            if not json_str.startswith('{'):
-                # Look for JSON object in the text
-                start = json_str.find('{')
-                end = json_str.rfind('}') + 1
-                if start >= 0 and end > start:
-                    json_str = json_str[start:end]
-            
-            logger.debug(f"Attempting to parse JSON: {json_str[:200]}...")
-            data = json.loads(json_str)
+            try:
+                # The prompt asks for bare JSON, which most responses are
+                data = orjson.loads(response_text)
+            except orjson.JSONDecodeError:
+                # Gemini sometimes wraps the JSON in markdown code blocks or
+                # text; take everything from the first '{' to the last '}'
+                match = _JSON_OBJECT_RE.search(response_text)
+                if match is None:
+                    raise ValueError("No JSON object in response")
+                
+                data = orjson.loads(match.group(0))
             
             # Validate required fields
             if 'question' not in data:
@@ -437,7 +776,7 @@ IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
             
             return data
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"JSON decode error: {e}")
             logger.error(f"Raw response: {response_text[:500]}")
             raise
@@ -445,3 +784,39 @@ IMPORTANT: Return ONLY valid JSON in this exact format (no extra text):
             logger.error(f"Failed to parse response: {e}")
             logger.error(f"Raw response: {response_text[:500]}")
             raise
+    
+    def _parse_batch_response(self, response_text: str, question_type: QuestionType) -> List[Dict]:
+        """Parse a Gemini response holding a JSON array of questions (a single object is also accepted)"""
+        json_str = response_text.strip()
+        
+        # Strip markdown code fences if present
+        if "```" in json_str:
+            parts = json_str.split("```")
+            if len(parts) >= 3:
+                json_str = parts[1]
+                if json_str.startswith("json"):
+                    json_str = json_str[4:]
+                json_str = json_str.strip()
+        
+        # Cut the array out of any surrounding text; an object that comes first
+        # (whose "options" list would otherwise match) is parsed on its own
+        start = json_str.find('[')
+        end = json_str.rfind(']') + 1
+        object_start = json_str.find('{')
+        if start >= 0 and end > start and (object_start < 0 or start < object_start):
+            data = orjson.loads(json_str[start:end])
+        else:
+            data = self._parse_response(response_text, question_type)
+        
+        return data if isinstance(data, list) else [data]
+
+# Global generator instance
+_generator_instance: Optional[QuestionGenerator] = None
+
+
+def get_question_generator() -> QuestionGenerator:
+    """Get or create global question generator instance"""
+    global _generator_instance
+    if _generator_instance is None:
+        _generator_instance = QuestionGenerator()
+    return _generator_instance
@@ -2,15 +2,40 @@
 Syllabus Parser Service
 Extracts text from files and parses units/topics
 """
+import hashlib
 import re
 import logging
 from typing import List
 import fitz  # PyMuPDF
 
 from app.models import Unit
+from app.utils.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Patterns used on every parse, compiled once
+_MULTI_SPACE_RE = re.compile(r' +')
+_TOPIC_DELIMITER_RE = re.compile(r'\s*[–—]\s*')
+_LEADING_NUMBER_RE = re.compile(r'^\d+\s*')
+_PDF_ARTIFACT_RE = re.compile(r'Downloaded from \w+\.com|EnggTree\.com', re.IGNORECASE)
+_PAGE_NUMBER_RE = re.compile(r'\n\s*\d+\s*\n')
+_SECTION_START_RE = re.compile(r'(?i)^(unit|chapter|module|\d+\.)')
+_TRAILING_PUNCT_RE = re.compile(r'[:\.\-–—]+$')
+_BULLET_RE = re.compile(r'^[\-\*\•\d\.]+\s*')
+_TOPIC_HEADER_RE = re.compile(r'(?i)^(topics?|syllabus|course|objectives?|unit\s+[IVX]+):?$')
+_BLANK_LINE_RE = re.compile(r'\n\s*\n')
+
+# Literal fragments every skip pattern match must contain; lines without any
+# of them can't match, so the regex only runs on the rest
+_SKIP_KEYWORDS = (
+    'book', 'reference', 'bibliography', 'reading',
+    'edition', 'publisher', 'publication', 'pearson', 'mcgraw', 'wiley',
+    'downloaded', 'enggtree.com', 'copyright',
+)
+
+_ROMAN_MAP = {'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5,
+              'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10}
+
 
 class SyllabusParser:
     """Parse syllabus content and extract unit            # If no units found with patterns, try inline extraction first
@@ -24,30 +49,44 @@ class SyllabusParser:
                 units = self._smart_parse_without_units(content)pics"""
     
     def __init__(self):
-        self.unit_patterns = [
+        self.unit_patterns = [re.compile(pattern) for pattern in (
             r'(?i)^unit\s+(\d+)\s*:\s*(.+)',  # Match "Unit 1: LISTS"
             r'(?i)^unit\s+(\d+)\s+(.+)',  # Match "Unit 1 LISTS"
             r'(?i)^chapter\s+(\d+)\s*[:\-–—]?\s*(.+)',
             r'(?i)^module\s+(\d+)\s*[:\-–—]?\s*(.+)',
             r'(?i)^(\d+)\.\s*(.+)',  # Numbered sections like "1. Introduction"
             r'(?i)^unit\s+([IVX]+)\s*[:\-–—]?\s*(.+)',  # Roman numerals
-        ]
+        )]
+        # Every unit header matches this single alternation; lines that don't
+        # (most topic lines) skip the per-pattern loop
+        self._unit_header_re = re.compile(
+            '|'.join(f'(?:{pattern.pattern[len("(?i)"):]})' for pattern in self.unit_patterns),
+            re.IGNORECASE
+        )
         # Pattern to find UNIT within text (not just at line start)
-        self.inline_unit_pattern = r'UNIT\s+([IVX]+)\s+([A-Z\s&,]+?)\s+\d+'
+        self.inline_unit_pattern = re.compile(r'UNIT\s+([IVX]+)\s+([A-Z\s&,]+?)\s+\d+')
         
         # Patterns to identify and skip reference/textbook sections
-        self.skip_patterns = [
-            r'(?i)(text\s*book|reference|bibliography|suggested\s+reading)',
-            r'(?i)(edition|publisher|publication|pearson|mcgraw|wiley)',
-            r'(?i)(downloaded\s+from|enggtree\.com|copyright)',
-        ]
+        self.skip_patterns = (
+            r'text\s*book|reference|bibliography|suggested\s+reading',
+            r'edition|publisher|publication|pearson|mcgraw|wiley',
+            r'downloaded\s+from|enggtree\.com|copyright',
+        )
+        # All skip patterns fused into one alternation so a line is scanned once
+        self._skip_re = re.compile('|'.join(self.skip_patterns), re.IGNORECASE)
+        
+        # Parsed units by content hash; re-uploads of the same syllabus skip parsing
+        self._parse_cache = LRUCache(maxsize=64)
     
     def _should_skip_line(self, line: str) -> bool:
         """Check if a line should be skipped (references, etc.)"""
-        for pattern in self.skip_patterns:
-            if re.search(pattern, line):
-                return True
-        return False
+        # Unicode case folding can match non-ASCII lookalikes, so only ASCII
+        # lines take the substring shortcut
+        if line.isascii():
+            lowered = line.lower()
+            if not any(keyword in lowered for keyword in _SKIP_KEYWORDS):
+                return False
+        return self._skip_re.search(line) is not None
     
     def _extract_units_from_inline_text(self, content: str) -> List[Unit]:
         """
@@ -56,51 +95,48 @@ class SyllabusParser:
         """
         units = []
         
+        # Every marker contains a literal "UNIT", so most text can skip the regex scan
+        if 'UNIT' not in content:
+            return []
+        
         # Find all UNIT markers
-        matches = list(re.finditer(self.inline_unit_pattern, content))
+        matches = list(self.inline_unit_pattern.finditer(content))
         
         if len(matches) < 2:
             return []
         
         logger.info(f"Found {len(matches)} inline unit markers")
         
-        for i, match in enumerate(matches):
+        # Each unit's content runs from its marker to the next marker (or the end)
+        end_positions = [m.start() for m in matches[1:]]
+        end_positions.append(len(content))
+        
+        for i, (match, end_pos) in enumerate(zip(matches, end_positions)):
             unit_number_raw = match.group(1)
             unit_title = match.group(2).strip()
             
             # Convert Roman to number
-            roman_map = {'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5, 
-                        'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10}
-            unit_number = roman_map.get(unit_number_raw, i + 1)
+            unit_number = _ROMAN_MAP.get(unit_number_raw, i + 1)
             
-            # Extract content for this unit (from this match to next match or end)
-            start_pos = match.end()
-            end_pos = matches[i + 1].start() if i + 1 < len(matches) else len(content)
-            unit_content = content[start_pos:end_pos].strip()
+            # Extract content for this unit (a single slice)
+            unit_content = content[match.end():end_pos].strip()
             
             # Extract topics from unit content
             # Topics are usually separated by – or listed after certain keywords
-            topics = []
-            
-            # Split by common delimiters
-            parts = re.split(r'\s*[–—]\s*', unit_content)
-            for part in parts:
-                part = part.strip()
-                # Skip very short or reference-like parts
-                if len(part) > 10 and not self._should_skip_line(part):
-                    # Clean up
-                    part = re.sub(r'\s+', ' ', part)
-                    part = re.sub(r'^\d+\s*', '', part)  # Remove leading numbers
-                    if part:
-                        topics.append(part[:200])  # Limit topic length
-            
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_topics = []
+            # Split by common delimiters, skip very short or reference-like
+            # parts, then collapse whitespace and remove leading numbers
+            cleaned_parts = (
+                _LEADING_NUMBER_RE.sub('', ' '.join(part.split()))
+                for part in map(str.strip, _TOPIC_DELIMITER_RE.split(unit_content))
+                if len(part) > 10 and not self._should_skip_line(part)
+            )
+            topics = [part[:200] for part in cleaned_parts if part]  # Limit topic length
+            
+            # Remove duplicates (case-insensitive, first spelling wins) while preserving order
+            first_by_key = {}
             for topic in topics:
-                if topic.lower() not in seen:
-                    seen.add(topic.lower())
-                    unique_topics.append(topic)
+                first_by_key.setdefault(topic.lower(), topic)
+            unique_topics = list(first_by_key.values())
             
             if unique_topics:
                 unit = Unit(
@@ -122,41 +158,52 @@ class SyllabusParser:
         - Remove common PDF artifacts
         """
         # Remove common PDF artifacts
-        text = re.sub(r'Downloaded from \w+\.com', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'EnggTree\.com', '', text, flags=re.IGNORECASE)
+        text = _PDF_ARTIFACT_RE.sub('', text)
         
         # Remove page numbers (standalone numbers on lines)
-        text = re.sub(r'\n\s*\d+\s*\n', '\n', text)
+        text = _PAGE_NUMBER_RE.sub('\n', text)
         
         # Fix broken lines (line breaks in middle of sentences)
         # Join lines that don't end with period, colon, or dash
-        lines = text.split('\n')
+        lines = [line.strip() for line in text.split('\n')]
+        num_lines = len(lines)
         fixed_lines = []
         i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+        while i < num_lines:
+            line = lines[i]
             if not line:
                 fixed_lines.append('')
                 i += 1
                 continue
             
-            # If line doesn't end with punctuation and next line doesn't start a new section
-            while (i + 1 < len(lines) and 
-                   not line.endswith(('.', ':', '–', '-', '—')) and
-                   not re.match(r'(?i)^(unit|chapter|module|\d+\.)', lines[i + 1].strip())):
-                next_line = lines[i + 1].strip()
-                if next_line:
-                    line += ' ' + next_line
+            # If line doesn't end with punctuation and next line doesn't start a
+            # new section, collect the continuation fragments and join once
+            fragments = [line]
+            while (i + 1 < num_lines and
+                   not fragments[-1].endswith(('.', ':', '–', '-', '—')) and
+                   not _SECTION_START_RE.match(lines[i + 1])):
+                if lines[i + 1]:
+                    fragments.append(lines[i + 1])
                 i += 1
             
-            fixed_lines.append(line)
+            fixed_lines.append(' '.join(fragments))
             i += 1
         
         text = '\n'.join(fixed_lines)
         
         # Normalize whitespace
-        text = re.sub(r' +', ' ', text)
+        text = _MULTI_SPACE_RE.sub(' ', text)
+        
+        return text
+    
+    def _extract_text_from_doc(self, doc: "fitz.Document") -> str:
+        """Join the text of every page in an open PDF and clean it"""
+        text = "\n".join(page.get_text("text") for page in doc)
         
+        # Additional cleaning
+        text = text.replace('\x00', '')  # Remove null bytes
+        text = ' '.join(text.split())  # Normalize whitespace
+        text = text.replace(' - ', ' – ')  # Normalize dashes
         return text
     
     def extract_text_from_pdf(self, file_path: str) -> str:
@@ -170,17 +217,8 @@ class SyllabusParser:
             Extracted text content
         """
         try:
-            text = ""
             with fitz.open(file_path) as doc:
-                for page in doc:
-                    page_text = page.get_text()
-                    # Clean up the text
-                    page_text = page_text.replace('\x00', '')  # Remove null bytes
-                    text += page_text + "\n"
-            
-            # Additional cleaning
-            text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-            text = text.replace(' - ', ' – ')  # Normalize dashes
+                text = self._extract_text_from_doc(doc)
             
             logger.info(f"Extracted {len(text)} characters from PDF")
             logger.debug(f"First 500 chars: {text[:500]}")
@@ -202,18 +240,9 @@ class SyllabusParser:
             Extracted text content
         """
         try:
-            text = ""
             # Open PDF from memory
             with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-                for page in doc:
-                    page_text = page.get_text()
-                    # Clean up the text
-                    page_text = page_text.replace('\x00', '')  # Remove null bytes
-                    text += page_text + "\n"
-            
-            # Additional cleaning
-            text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-            text = text.replace(' - ', ' – ')  # Normalize dashes
+                text = self._extract_text_from_doc(doc)
             
             logger.info(f"Extracted {len(text)} characters from PDF bytes")
             logger.debug(f"First 500 chars: {text[:500]}")
@@ -228,12 +257,28 @@ class SyllabusParser:
         """
         Parse syllabus text and extract units with topics
         
+        Parsing is deterministic, so results are cached by a hash of the
+        content and identical syllabi are only parsed once.
+        
         Args:
             content: Raw syllabus text
             
         Returns:
             List of parsed units
         """
+        content_hash = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        units = self._parse_cache.get(content_hash)
+        if units is None:
+            units = self._parse_text(content)
+            self._parse_cache.set(content_hash, units)
+        else:
+            logger.info(f"✓ Reusing {len(units)} parsed units for identical syllabus content")
+        
+        # Callers get their own copies so the cached units stay untouched
+        return [unit.model_copy(update={'topics': list(unit.topics)}) for unit in units]
+    
+    def _parse_text(self, content: str) -> List[Unit]:
+        """Parse syllabus text into units (uncached)"""
         units = []
         
         try:
@@ -262,8 +307,9 @@ class SyllabusParser:
                 
                 # Check if line matches any unit pattern
                 unit_matched = False
-                for pattern in self.unit_patterns:
-                    match = re.match(pattern, line)
+                candidate_patterns = self.unit_patterns if self._unit_header_re.match(line) else ()
+                for pattern in candidate_patterns:
+                    match = pattern.match(line)
                     if match:
                         unit_number_raw = match.group(1)
                         unit_title = match.group(2).strip()
@@ -274,12 +320,7 @@ class SyllabusParser:
                             continue
                         
                         # Convert Roman numerals to numbers
-                        if unit_number_raw.upper() in ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X']:
-                            roman_map = {'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5, 
-                                       'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10}
-                            unit_number = roman_map.get(unit_number_raw.upper(), unit_count + 1)
-                        else:
-                            unit_number = unit_number_raw
+                        unit_number = _ROMAN_MAP.get(unit_number_raw.upper(), unit_number_raw)
                         
                         # Save previous unit if exists
                         if current_unit and current_topics:
@@ -291,7 +332,7 @@ class SyllabusParser:
                         unit_count += 1
                         
                         # Remove trailing dots, colons, etc.
-                        unit_title = re.sub(r'[:\.\-–—]+$', '', unit_title).strip()
+                        unit_title = _TRAILING_PUNCT_RE.sub('', unit_title).strip()
                         
                         # Skip if title is too short (likely parsing error)
                         if len(unit_title) < 3:
@@ -311,7 +352,7 @@ class SyllabusParser:
                 # If not a unit header, treat as a topic
                 if not unit_matched and current_unit:
                     # Remove bullet points and numbering
-                    topic = re.sub(r'^[\-\*\•\d\.]+\s*', '', line)
+                    topic = _BULLET_RE.sub('', line)
                     topic = topic.strip()
                     
                     # Skip reference lines in topics
@@ -320,7 +361,7 @@ class SyllabusParser:
                     
                     # Filter out very short lines and common headers
                     if (topic and len(topic) > 5 and 
-                        not re.match(r'(?i)^(topics?|syllabus|course|objectives?|unit\s+[IVX]+):?$', topic)):
+                        not _TOPIC_HEADER_RE.match(topic)):
                         current_topics.append(topic)
                         logger.debug(f"  Added topic: {topic[:50]}...")
             
@@ -330,15 +371,19 @@ class SyllabusParser:
                 units.append(current_unit)
                 logger.debug(f"Saved final unit: {current_unit.title} with {len(current_topics)} topics")
             
+            # Fallback parses are deterministic, so each runs at most once
+            inline_units = None
+            smart_units = None
+            
             # If no units found with patterns, try inline extraction first
             if not units:
                 logger.warning("No units found with line patterns, trying inline extraction")
-                units = self._extract_units_from_inline_text(content)
+                units = inline_units = self._extract_units_from_inline_text(content)
             
             # If still no units, try smart parse
             if not units:
                 logger.warning("Inline extraction failed, attempting smart split")
-                units = self._smart_parse_without_units(content)
+                units = smart_units = self._smart_parse_without_units(content)
             
             # Ensure all units have at least some topics and filter out likely references
             units = [u for u in units if u.topics and not self._should_skip_line(u.title)]
@@ -346,12 +391,15 @@ class SyllabusParser:
             # If we ended up with no units or very few, try inline then smart parse
             if len(units) < 2:
                 logger.warning(f"Only {len(units)} valid units found, trying inline extraction")
-                inline_units = self._extract_units_from_inline_text(content)
+                if inline_units is None:
+                    inline_units = self._extract_units_from_inline_text(content)
                 if len(inline_units) > len(units):
                     units = inline_units
                 elif not units:
                     logger.warning("Inline failed, attempting full reparse")
-                    units = self._smart_parse_without_units(content)
+                    if smart_units is None:
+                        smart_units = self._smart_parse_without_units(content)
+                    units = smart_units
             
             logger.info(f"✓ Successfully parsed {len(units)} units from syllabus")
             for unit in units:
@@ -368,7 +416,7 @@ class SyllabusParser:
         Fallback parser when no unit headers are found.
         Splits content into logical sections based on blank lines.
         """
-        sections = re.split(r'\n\s*\n', content)  # Split by blank lines
+        sections = _BLANK_LINE_RE.split(content)  # Split by blank lines
         units = []
         
         for i, section in enumerate(sections, 1):
@@ -376,20 +424,18 @@ class SyllabusParser:
             if not section or len(section) < 10:
                 continue
             
-            lines = [l.strip() for l in section.split('\n') if l.strip()]
+            lines = [l for l in map(str.strip, section.split('\n')) if l]
             if not lines:
                 continue
             
             # First line might be a title
             title = lines[0] if len(lines[0]) < 100 else f"Section {i}"
-            topics = [re.sub(r'^[\-\*\•\d\.]+\s*', '', l).strip() 
-                     for l in lines[1:] if len(l.strip()) > 3]
+            topics = [_BULLET_RE.sub('', l).strip() for l in lines[1:] if len(l) > 3]
             
             if not topics and len(lines) > 1:
                 # If first line is too long, treat all as topics
                 title = f"Section {i}"
-                topics = [re.sub(r'^[\-\*\•\d\.]+\s*', '', l).strip() 
-                         for l in lines if len(l.strip()) > 3]
+                topics = [_BULLET_RE.sub('', l).strip() for l in lines if len(l) > 3]
             
             if topics:
                 units.append(Unit(
@@ -401,8 +447,7 @@ class SyllabusParser:
         
         if not units:
             # Last resort: create one unit with all non-empty lines
-            all_lines = [l.strip() for l in content.split('\n') 
-                        if l.strip() and len(l.strip()) > 3]
+            all_lines = [l for l in map(str.strip, content.split('\n')) if len(l) > 3]
             if all_lines:
                 units.append(Unit(
                     id="unit_1",
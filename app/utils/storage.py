@@ -1,15 +1,24 @@
 """
 Persistent storage utility using JSON files with in-memory fallback for serverless
 """
-import json
 import os
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Store files stay indented so they remain readable and diffable
+_STORE_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+# Single-item writes are appended to a per-store log as [item_id, item]
+# records ([item_id, null] for deletes); once the log grows past this size
+# it is folded back into the store file
+LOG_COMPACT_BYTES = 1024 * 1024
+
 
 class JSONStorage:
     """JSON-based storage with in-memory fallback for read-only file systems"""
@@ -22,7 +31,11 @@ class JSONStorage:
             storage_dir: Directory to store JSON files
         """
         self.storage_dir = Path(storage_dir)
+        self.index_dir = self.storage_dir / "indexes"
         self.memory_cache: Dict[str, Dict[str, Any]] = {}
+        self.index_fields: Dict[str, Tuple[str, ...]] = {}
+        # Parsed stores keyed by name, stamped with the file state they match
+        self._store_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
         self.is_readonly = False
         
         # Try to create directory, if fails, use memory-only mode
@@ -45,9 +58,12 @@ class JSONStorage:
             if self.storage_dir.exists():
                 for json_file in self.storage_dir.glob("*.json"):
                     store_name = json_file.stem
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        self.memory_cache[store_name] = json.load(f)
-                    logger.info(f"Loaded {len(self.memory_cache[store_name])} items from '{store_name}' into memory")
+                    self.memory_cache[store_name] = orjson.loads(json_file.read_bytes())
+                for log_file in self.storage_dir.glob("*.log.jsonl"):
+                    store_name = log_file.name[:-len(".log.jsonl")]
+                    self._replay_log(log_file, self.memory_cache.setdefault(store_name, {}))
+                for store_name, data in self.memory_cache.items():
+                    logger.info(f"Loaded {len(data)} items from '{store_name}' into memory")
         except Exception as e:
             logger.warning(f"Could not load existing data: {e}")
     
@@ -55,10 +71,158 @@ class JSONStorage:
         """Get file path for a store"""
         return self.storage_dir / f"{store_name}.json"
     
+    def _get_log_path(self, store_name: str) -> Path:
+        """Get file path for a store's append log"""
+        return self.storage_dir / f"{store_name}.log.jsonl"
+    
+    def _get_stamp(self, store_name: str) -> Optional[Tuple[int, int]]:
+        """Store file mtime and log size, or None if the store has neither"""
+        try:
+            mtime_ns = self._get_file_path(store_name).stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = -1
+        try:
+            log_size = self._get_log_path(store_name).stat().st_size
+        except FileNotFoundError:
+            log_size = -1
+        if mtime_ns < 0 and log_size < 0:
+            return None
+        return mtime_ns, log_size
+    
+    def _replay_log(self, log_path: Path, data: Dict[str, Any]) -> None:
+        """Apply an append log's records to a store dict in place"""
+        for line in log_path.read_bytes().splitlines():
+            try:
+                item_id, item_data = orjson.loads(line)
+            except (orjson.JSONDecodeError, ValueError):
+                # A torn final write; everything before it is intact
+                logger.warning(f"Skipping unreadable record in '{log_path.name}'")
+                continue
+            if item_data is None:
+                data.pop(item_id, None)
+            else:
+                data[item_id] = item_data
+    
+    def _append_record(self, store_name: str, item_id: str, item_data: Optional[Dict[str, Any]], data: Dict[str, Any]) -> bool:
+        """
+        Persist a single-item change by appending it to the store's log
+        
+        Args:
+            store_name: Name of the store
+            item_id: Item that changed
+            item_data: New item value, or None for a delete
+            data: The full store with the change already applied
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if self.is_readonly:
+            self.memory_cache[store_name] = data
+            return True
+        
+        record = orjson.dumps([item_id, item_data], default=str, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+        try:
+            fd = os.open(self._get_log_path(store_name), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, record)
+                os.fsync(fd)
+                log_size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+        except Exception as e:
+            logger.warning(f"Could not append to '{store_name}' log, rewriting store: {e}")
+            return self.save_store(store_name, data)
+        
+        if log_size > LOG_COMPACT_BYTES:
+            logger.info(f"Compacting '{store_name}' log ({log_size} bytes)")
+            return self.save_store(store_name, data)
+        
+        self._store_cache[store_name] = (self._get_stamp(store_name), data)
+        if store_name in self.index_fields:
+            self._append_index_record(store_name, item_id, item_data)
+        return True
+    
+    def _get_index_path(self, store_name: str) -> Path:
+        """Get file path for a store's summary index"""
+        return self.index_dir / f"{store_name}.json"
+    
+    def _get_index_log_path(self, store_name: str) -> Path:
+        """Get file path for a store's summary index append log"""
+        return self.index_dir / f"{store_name}.log.jsonl"
+    
+    def _summarize(self, store_name: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Project one item down to its indexed fields"""
+        return {field: item.get(field) for field in self.index_fields[store_name]}
+    
+    def _build_index(self, store_name: str, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Project every item in a store down to its indexed fields, keyed by item ID"""
+        return {item_id: self._summarize(store_name, item) for item_id, item in data.items()}
+    
+    def _save_index(self, store_name: str, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Rebuild and write the summary index for a store, folding in its log"""
+        index = self._build_index(store_name, data)
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            index_path = self._get_index_path(store_name)
+            temp_path = index_path.with_suffix('.tmp')
+            temp_path.write_bytes(orjson.dumps(index, default=str, option=orjson.OPT_NON_STR_KEYS))
+            temp_path.replace(index_path)
+            self._get_index_log_path(store_name).unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"Could not write index for '{store_name}': {e}")
+        return index
+    
+    def _append_index_record(self, store_name: str, item_id: str, item_data: Optional[Dict[str, Any]]) -> None:
+        """
+        Record a single-item change in the index log instead of rebuilding the index
+        
+        The index is derived data, so there is no fsync; if the append fails the
+        index log stays older than the store log and the next listing rebuilds.
+        """
+        summary = None if item_data is None else self._summarize(store_name, item_data)
+        record = orjson.dumps([item_id, summary], default=str, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._get_index_log_path(store_name), "ab") as f:
+                f.write(record)
+        except Exception as e:
+            logger.warning(f"Could not append to '{store_name}' index log: {e}")
+    
+    def _index_is_current(self, store_name: str) -> bool:
+        """
+        Whether the index file plus its log reflect the store file plus its log
+        
+        The index file is written after every full store save and the index log
+        is appended after every store log append, so each must be at least as
+        new as its store counterpart.
+        """
+        def mtime(path: Path) -> Optional[int]:
+            try:
+                return path.stat().st_mtime_ns
+            except FileNotFoundError:
+                return None
+        
+        store_mtime = mtime(self._get_file_path(store_name))
+        log_mtime = mtime(self._get_log_path(store_name))
+        index_mtime = mtime(self._get_index_path(store_name))
+        index_log_mtime = mtime(self._get_index_log_path(store_name))
+        
+        if index_mtime is None or (store_mtime is not None and index_mtime < store_mtime):
+            return False
+        if log_mtime is None:
+            # Store log was compacted away; index changes must have been too
+            return index_log_mtime is None
+        return max(index_mtime, index_log_mtime or -1) >= log_mtime
+    
     def load_store(self, store_name: str) -> Dict[str, Any]:
         """
         Load data from JSON file or memory cache
         
+        The store file is read and its append log replayed on top of it. The
+        result is cached and reused until either file changes.
+        The returned dict is shared, so only modify it through set_item /
+        delete_item / save_store.
+        
         Args:
             store_name: Name of the store (e.g., 'syllabi', 'question_papers')
             
@@ -71,16 +235,23 @@ class JSONStorage:
         
         file_path = self._get_file_path(store_name)
         
-        if not file_path.exists():
+        stamp = self._get_stamp(store_name)
+        if stamp is None:
             logger.info(f"Store '{store_name}' does not exist, returning empty dict")
             return {}
         
+        cached = self._store_cache.get(store_name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = orjson.loads(file_path.read_bytes()) if stamp[0] >= 0 else {}
+            if stamp[1] >= 0:
+                self._replay_log(self._get_log_path(store_name), data)
+            self._store_cache[store_name] = (stamp, data)
             logger.info(f"Loaded {len(data)} items from '{store_name}' store")
             return data
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Error decoding JSON from '{store_name}': {e}")
             return {}
         except Exception as e:
@@ -109,12 +280,18 @@ class JSONStorage:
         try:
             # Write to temporary file first
             temp_path = file_path.with_suffix('.tmp')
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            temp_path.write_bytes(orjson.dumps(data, default=str, option=_STORE_DUMP_OPTIONS))
             
             # Rename to actual file (atomic operation on most systems)
             temp_path.replace(file_path)
+            
+            # The store file now holds everything the log recorded
+            self._get_log_path(store_name).unlink(missing_ok=True)
+            self._store_cache[store_name] = (self._get_stamp(store_name), data)
             logger.debug(f"Saved {len(data)} items to '{store_name}' store")
+            
+            if store_name in self.index_fields:
+                self._save_index(store_name, data)
             return True
         except Exception as e:
             logger.error(f"Error saving '{store_name}': {e}", exc_info=True)
@@ -132,19 +309,78 @@ class JSONStorage:
         """Set a single item in store"""
         data = self.load_store(store_name)
         data[item_id] = item_data
+        return self._append_record(store_name, item_id, item_data, data)
+    
+    def set_items(self, store_name: str, items: Dict[str, Dict[str, Any]]) -> bool:
+        """Set many items in store with a single rewrite of the store file"""
+        if not items:
+            return True
+        data = self.load_store(store_name)
+        data.update(items)
         return self.save_store(store_name, data)
     
     def delete_item(self, store_name: str, item_id: str) -> bool:
-        """Delete a single item from store"""
+        """Delete a single item from store (False if it didn't exist or the delete couldn't be saved)"""
         data = self.load_store(store_name)
-        if item_id in data:
-            del data[item_id]
-            return self.save_store(store_name, data)
-        return False
+        if item_id not in data:
+            return False
+        del data[item_id]
+        return self._append_record(store_name, item_id, None, data)
     
     def list_items(self, store_name: str) -> Dict[str, Any]:
         """List all items in store"""
         return self.load_store(store_name)
+
+    def count_items(self, store_name: str) -> int:
+        """Count items in store without handing the data to the caller"""
+        if self.is_readonly:
+            return len(self.memory_cache.get(store_name, ()))
+        return len(self.load_store(store_name))
+
+    def register_index(self, store_name: str, fields: Sequence[str]) -> None:
+        """
+        Maintain a summary index for a store
+        
+        Args:
+            store_name: Name of the store
+            fields: Item fields copied into the index on every save
+        """
+        self.index_fields[store_name] = tuple(fields)
+    
+    def list_item_summaries(self, store_name: str) -> List[Dict[str, Any]]:
+        """
+        List the indexed fields of every item without loading full items
+        
+        Reads the index file and replays its append log (single-item writes
+        append one summary there). Falls back to rebuilding the index from the
+        store when it is missing, unreadable, or older than the store file or
+        its append log (e.g. the store was edited by a script).
+        
+        Args:
+            store_name: Name of a store registered with register_index
+            
+        Returns:
+            List of summary dicts, one per item
+        """
+        if self.is_readonly:
+            return list(self._build_index(store_name, self.memory_cache.get(store_name, {})).values())
+        
+        if self._get_stamp(store_name) is None:
+            return []
+        
+        if self._index_is_current(store_name):
+            try:
+                index = orjson.loads(self._get_index_path(store_name).read_bytes())
+                if isinstance(index, dict):
+                    index_log_path = self._get_index_log_path(store_name)
+                    if index_log_path.exists():
+                        self._replay_log(index_log_path, index)
+                    return list(index.values())
+                logger.warning(f"Rebuilding index for '{store_name}' from an older format")
+            except (OSError, orjson.JSONDecodeError) as e:
+                logger.warning(f"Rebuilding unreadable index for '{store_name}': {e}")
+        
+        return list(self._save_index(store_name, self.load_store(store_name)).values())
     
     def clear_store(self, store_name: str) -> bool:
         """Clear all items from store"""
@@ -8,29 +8,90 @@ import sys
 import re
 import fitz  # PyMuPDF
 
+# Unit header to match: UNIT I LISTS 9
+# Captures: roman numeral, title, credit hours
+UNIT_HEADER_PATTERN = re.compile(r'UNIT\s+([IVX]+)\s+([A-Z\s&,]+?)\s+(\d+)\s+', re.IGNORECASE)
+# Where a unit's content ends: the next UNIT or a trailing section
+UNIT_END_PATTERN = re.compile(r'UNIT\s+[IVX]+\s+|COURSE\s+OUTCOMES|TOTAL|TEXT\s*BOOKS|REFERENCES|$', re.IGNORECASE)
+# Split by common separators: – (en dash), — (em dash), - (hyphen)
+SEPARATOR_PATTERN = re.compile(r'\s*[–—-]\s+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+YEAR_PATTERN = re.compile(r'\d{4}')
+# Noise to filter out of topics: leftover headings and book/page details
+NOISE_PREFIX_PATTERN = re.compile(r'UNIT|COURSE|TEXT', re.IGNORECASE)
+NOISE_WORD_PATTERN = re.compile(r'page|edition|published|isbn', re.IGNORECASE)
+
 def roman_to_int(roman):
     """Convert Roman numeral to integer"""
     mapping = {'I': '1', 'II': '2', 'III': '3', 'IV': '4', 'V': '5', 
                'VI': '6', 'VII': '7', 'VIII': '8', 'IX': '9', 'X': '10'}
     return mapping.get(roman, roman)
 
+def search_unit_header(text, lowered, pos):
+    """
+    Find the next unit header at or after pos
+    
+    A case-insensitive regex search can't skip ahead on its literal prefix, so
+    when a lowercased copy is available, candidates are located with a plain
+    str.find for 'unit' and the regex only runs at those offsets.
+    """
+    if lowered is None:
+        return UNIT_HEADER_PATTERN.search(text, pos)
+    i = lowered.find('unit', pos)
+    while i >= 0:
+        header = UNIT_HEADER_PATTERN.match(text, i)
+        if header:
+            return header
+        i = lowered.find('unit', i + 1)
+    return None
+
+def find_units(text):
+    """
+    Find (roman, title, credits, content) for every unit in the text
+    
+    Headers and content ends are located with two plain searches instead of
+    a lazy .*? followed by a lookahead, so the scan stays linear.
+    """
+    # Offsets in the lowercased copy only line up with the text when lower()
+    # kept its length, and 'ı' matches 'I' in the regex without lowering to 'i'
+    lowered = text.lower()
+    if len(lowered) != len(text) or 'ı' in text:
+        lowered = None
+    
+    units = []
+    pos = 0
+    while True:
+        header = search_unit_header(text, lowered, pos)
+        if header is None:
+            return units
+        end = UNIT_END_PATTERN.search(text, header.end()).start()
+        units.append((*header.groups(), text[header.end():end]))
+        pos = end
+
 def extract_units_from_pdf(pdf_path):
     """Extract units from PDF and format properly"""
     
     # Read PDF
-    doc = fitz.open(pdf_path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    doc.close()
+    with fitz.open(pdf_path) as doc:
+        text = "".join(page.get_text("text") for page in doc)
     
-    print(f"📄 Extracted {len(text)} characters from PDF\n")
+    return format_units(text)
+
+def extract_units_from_bytes(pdf_bytes):
+    """Extract units from in-memory PDF bytes and format properly"""
+    
+    # Read PDF without touching the file system
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        text = "".join(page.get_text("text") for page in doc)
     
-    # Pattern to match: UNIT I LISTS 9
-    # Captures: roman numeral, title, credit hours, and content until next UNIT
-    pattern = r'UNIT\s+([IVX]+)\s+([A-Z\s&,]+?)\s+(\d+)\s+(.*?)(?=UNIT\s+[IVX]+\s+|COURSE\s+OUTCOMES|TOTAL|TEXT\s*BOOKS|REFERENCES|$)'
+    return format_units(text)
+
+def format_units(text):
+    """Find the units in extracted PDF text and format them"""
+    
+    print(f"📄 Extracted {len(text)} characters from PDF\n")
     
-    matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
+    matches = find_units(text)
     
     if not matches:
         print("❌ No units found with pattern matching!")
@@ -45,7 +106,7 @@ def extract_units_from_pdf(pdf_path):
     
     print(f"✅ Found {len(matches)} units\n")
     
-    formatted = ""
+    formatted = []
     all_topics = []
     
     for roman, title, credits, content in matches:
@@ -53,38 +114,36 @@ def extract_units_from_pdf(pdf_path):
         title = title.strip()
         
         print(f"Unit {unit_num}: {title} ({credits} credits)")
-        formatted += f"Unit {unit_num}: {title}\n"
+        formatted.append(f"Unit {unit_num}: {title}\n")
         
         # Clean content
         content = content.strip()
         
         # Split by common separators: – (en dash), — (em dash), - (hyphen)
-        topics = re.split(r'\s*[–—-]\s+', content)
+        topics = SEPARATOR_PATTERN.split(content)
         
         unit_topics = []
         for topic in topics:
             topic = topic.strip()
             # Filter out noise
             if (len(topic) > 10 and 
-                not topic.upper().startswith('UNIT') and
-                not topic.upper().startswith('COURSE') and
-                not topic.upper().startswith('TEXT') and
-                not any(x in topic.lower() for x in ['page', 'edition', 'published', 'isbn'])):
+                not NOISE_PREFIX_PATTERN.match(topic) and
+                not NOISE_WORD_PATTERN.search(topic)):
                 
                 # Clean up the topic
-                topic = re.sub(r'\s+', ' ', topic)  # Normalize whitespace
-                topic = re.sub(r'\d{4}', '', topic)  # Remove years
+                topic = WHITESPACE_PATTERN.sub(' ', topic)  # Normalize whitespace
+                topic = YEAR_PATTERN.sub('', topic)  # Remove years
                 
                 if len(topic) > 15:  # Reasonable topic length
-                    formatted += f"- {topic}\n"
+                    formatted.append(f"- {topic}\n")
                     unit_topics.append(topic)
                     print(f"  - {topic[:80]}{'...' if len(topic) > 80 else ''}")
         
         all_topics.append(unit_topics)
-        formatted += "\n"
+        formatted.append("\n")
         print()
     
-    return formatted, matches, all_topics
+    return "".join(formatted), matches, all_topics
 
 def main():
     if len(sys.argv) < 2:
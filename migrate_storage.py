@@ -5,6 +5,7 @@ This script reads existing uploaded PDFs and migrates them to the new JSON stora
 import os
 import sys
 import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Add parent directory to path
@@ -14,11 +15,37 @@ from app.services.syllabus_parser import SyllabusParser
 from app.utils.storage import get_storage
 from app.models import Syllabus
 import logging
+import logging.handlers
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _stderr_handler() -> logging.Handler:
+    """Unbuffered stderr handler with the basicConfig format"""
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    return handler
+
+
+def _init_worker():
+    """Log straight to stderr in workers; a buffer inherited from the parent is never flushed there"""
+    logging.root.handlers = [_stderr_handler()]
+
+# Per-process parser for migration workers
+_parser = None
+
+
+def _extract_and_parse(pdf_path: str):
+    """Extract and parse one PDF in a worker process, returning (text, units)"""
+    global _parser
+    if _parser is None:
+        _parser = SyllabusParser()
+    # Read the file once and let PyMuPDF parse it from memory
+    text_content = _parser.extract_text_from_pdf_bytes(Path(pdf_path).read_bytes())
+    return text_content, _parser.parse_text(text_content)
+
+
 def migrate_uploaded_files():
     """Migrate existing uploaded PDF files to persistent storage"""
     
@@ -28,7 +55,6 @@ def migrate_uploaded_files():
         return
     
     storage = get_storage()
-    parser = SyllabusParser()
     
     # Get existing syllabi to avoid duplicates
     existing_syllabi = storage.list_items("syllabi")
@@ -37,51 +63,61 @@ def migrate_uploaded_files():
     pdf_files = list(uploads_dir.glob("*.pdf"))
     logger.info(f"Found {len(pdf_files)} PDF files in uploads directory")
     
-    migrated = 0
+    # Skip files already in storage
+    pending = []
     for pdf_file in pdf_files:
-        file_id = pdf_file.stem  # Get filename without extension
-        syllabus_id = f"syl_{file_id}"
-        
-        # Skip if already in storage
-        if syllabus_id in existing_ids:
+        if f"syl_{pdf_file.stem}" in existing_ids:
             logger.info(f"  ✓ Skipping {pdf_file.name} (already in storage)")
-            continue
-        
-        try:
-            logger.info(f"  Processing {pdf_file.name}...")
-            
-            # Extract text from PDF
-            text_content = parser.extract_text_from_pdf(str(pdf_file))
-            
-            # Parse units
-            units = parser.parse_text(text_content)
-            
-            if not units:
-                logger.warning(f"    ⚠ No units found in {pdf_file.name}, skipping")
-                continue
-            
-            # Create syllabus object
-            syllabus = Syllabus(
-                id=syllabus_id,
-                course_name=f"Migrated - {pdf_file.name}",
-                content=text_content,
-                units=units
-            )
-            
-            # Save to persistent storage
-            syllabus_dict = syllabus.model_dump()
-            storage.set_item("syllabi", syllabus.id, syllabus_dict)
-            
-            logger.info(f"    ✓ Migrated {pdf_file.name} with {len(units)} units")
-            migrated += 1
+        else:
+            pending.append(pdf_file)
+    
+    if not pending:
+        logger.info("\n✓ Migration complete! Migrated 0 new syllabi")
+        return
+    
+    migrated = {}
+    # Extract and parse in parallel; storage is only written from this process
+    with ProcessPoolExecutor(
+        max_workers=min(len(pending), os.cpu_count() or 1), initializer=_init_worker
+    ) as executor:
+        futures = {
+            executor.submit(_extract_and_parse, str(pdf_file)): pdf_file
+            for pdf_file in pending
+        }
+        for future in as_completed(futures):
+            pdf_file = futures[future]
+            syllabus_id = f"syl_{pdf_file.stem}"  # filename without extension
             
-        except Exception as e:
-            logger.error(f"    ✗ Error processing {pdf_file.name}: {e}")
+            try:
+                logger.info(f"  Processing {pdf_file.name}...")
+                
+                text_content, units = future.result()
+                
+                if not units:
+                    logger.warning(f"    ⚠ No units found in {pdf_file.name}, skipping")
+                    continue
+                
+                # Create syllabus object
+                syllabus = Syllabus(
+                    id=syllabus_id,
+                    course_name=f"Migrated - {pdf_file.name}",
+                    content=text_content,
+                    units=units
+                )
+                
+                # Collected and saved to persistent storage in one write below
+                migrated[syllabus.id] = syllabus.model_dump()
+                
+                logger.info(f"    ✓ Migrated {pdf_file.name} with {len(units)} units")
+                
+            except Exception as e:
+                logger.error(f"    ✗ Error processing {pdf_file.name}: {e}")
     
-    logger.info(f"\n✓ Migration complete! Migrated {migrated} new syllabi")
+    storage.set_items("syllabi", migrated)
+    logger.info(f"\n✓ Migration complete! Migrated {len(migrated)} new syllabi")
     
     # Show final count
-    final_count = len(storage.list_items("syllabi"))
+    final_count = storage.count_items("syllabi")
     logger.info(f"Total syllabi in storage: {final_count}")
 
 
@@ -111,6 +147,15 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--list":
         list_stored_syllabi()
     else:
-        migrate_uploaded_files()
+        # Per-file progress lines are buffered and written in batches; errors
+        # are flushed straight away
+        log_buffer = logging.handlers.MemoryHandler(
+            capacity=200, flushLevel=logging.ERROR, target=_stderr_handler()
+        )
+        logging.root.handlers = [log_buffer]
+        try:
+            migrate_uploaded_files()
+        finally:
+            log_buffer.flush()
         print()
         list_stored_syllabi()
@@ -2,19 +2,20 @@
 Example test script for Question Paper Generator API
 Run after starting the server
 """
-import requests
+import asyncio
+import httpx
 import json
 
 BASE_URL = "http://localhost:8000"
 
-def test_health():
+async def test_health(client):
     """Test health endpoint"""
     print("Testing health endpoint...")
-    response = requests.get(f"{BASE_URL}/health")
+    response = await client.get("/health")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}\n")
 
-def test_upload_syllabus():
+async def test_upload_syllabus(client):
     """Test syllabus upload"""
     print("Testing syllabus upload...")
     
@@ -54,8 +55,8 @@ Unit 5: Searching and Hashing
         """
     }
     
-    response = requests.post(
-        f"{BASE_URL}/api/syllabus/upload/text",
+    response = await client.post(
+        "/api/syllabus/upload/text",
         json=syllabus_data
     )
     
@@ -72,7 +73,7 @@ Unit 5: Searching and Hashing
         print(f"Error: {response.text}\n")
         return None
 
-def test_generate_questions(syllabus_id):
+async def test_generate_questions(client, syllabus_id):
     """Test question paper generation"""
     if not syllabus_id:
         print("Skipping question generation (no syllabus ID)\n")
@@ -114,8 +115,8 @@ def test_generate_questions(syllabus_id):
         }
     }
     
-    response = requests.post(
-        f"{BASE_URL}/api/question-paper/generate",
+    response = await client.post(
+        "/api/question-paper/generate",
         json=generation_rules
     )
     
@@ -140,24 +141,33 @@ def test_generate_questions(syllabus_id):
         print(f"Error: {response.text}\n")
         return None
 
-def test_list_syllabi():
+async def test_list_syllabi(client):
     """Test listing syllabi"""
     print("Testing list syllabi...")
-    response = requests.get(f"{BASE_URL}/api/syllabus/")
+    response = await client.get("/api/syllabus/")
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
         data = response.json()
         print(f"Total syllabi: {len(data)}\n")
 
-def test_list_papers():
+async def test_list_papers(client):
     """Test listing question papers"""
     print("Testing list question papers...")
-    response = requests.get(f"{BASE_URL}/api/question-paper/")
+    response = await client.get("/api/question-paper/")
     print(f"Status: {response.status_code}")
     if response.status_code == 200:
         data = response.json()
         print(f"Total question papers: {len(data)}\n")
 
+async def main():
+    """Run the calls in order, with the independent listings at the end in parallel"""
+    # No timeout: question generation can take a minute or more
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=None) as client:
+        await test_health(client)
+        syllabus_id = await test_upload_syllabus(client)
+        await test_generate_questions(client, syllabus_id)
+        await asyncio.gather(test_list_syllabi(client), test_list_papers(client))
+
 if __name__ == "__main__":
     print("=" * 60)
     print("Question Paper Generator API - Test Suite")
@@ -166,17 +176,13 @@ if __name__ == "__main__":
     
     try:
         # Run tests
-        test_health()
-        syllabus_id = test_upload_syllabus()
-        test_generate_questions(syllabus_id)
-        test_list_syllabi()
-        test_list_papers()
+        asyncio.run(main())
         
         print("=" * 60)
         print("✅ All tests completed!")
         print("=" * 60)
         
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Error: Could not connect to the server.")
         print("   Make sure the server is running at http://localhost:8000")
     except Exception as e:
@@ -13,144 +13,44 @@ from app.models.schemas import (
 )
 from app.services.pdf_generator import PDFGenerator
 from datetime import datetime
+from typing import List
+from pydantic import TypeAdapter
+from reportlab import rl_config
+
+# Renders compared when checking that repeated generation is stable
+RENDER_REPEATS = 50
+# Papers combined into the multi-paper PDF
+BATCH_SIZE = 10
+
+# Section banner for printed output
+BANNER = "=" * 60
+
+# Sample questions with CO and BL, one row per question
+QUESTION_FIELDS = (
+    "id", "unit_id", "unit_name", "question_text", "marks", "type", "difficulty",
+    "correct_answer", "answer_explanation", "course_outcome", "blooms_level"
+)
+QUESTION_ROWS = [
+    ("q1", "unit1", "Cloud Computing Fundamentals", "Describe the type of cloud computing.", 2, QuestionType.SHORT_ANSWER, "easy", "Types include IaaS, PaaS, SaaS", "Infrastructure as a Service, Platform as a Service, Software as a Service", "CO1", "K1"),
+    ("q2", "unit1", "Cloud Computing Fundamentals", "Difference between cloud computing and distributed computing.", 2, QuestionType.SHORT_ANSWER, "medium", "Cloud computing uses internet-based resources, distributed computing uses multiple computers", "Key differences in architecture and resource management", "CO1", "K2"),
+    ("q3", "unit2", "Virtualization", "Mention the role of hypervisor to manage virtual machines in a cloud environment.", 2, QuestionType.SHORT_ANSWER, "medium", "Hypervisor manages VM creation, resource allocation, and isolation", "Acts as a layer between hardware and VMs", "CO2", "K2"),
+    ("q4", "unit2", "Virtualization", "What is meant by hardware virtualization?", 2, QuestionType.SHORT_ANSWER, "easy", "Process of creating virtual versions of hardware resources", "Enables multiple OS to run on single physical hardware", "CO2", "K1"),
+    ("q5", "unit3", "Cloud Architecture", "List out the implementation methods of desktop virtualization.", 2, QuestionType.SHORT_ANSWER, "medium", "VDI, Session-based, Application virtualization", "Various methods to deliver desktop environments", "CO3", "K2"),
+    ("q6", "unit3", "Cloud Architecture", "What are virtual clusters in cloud computing, and how is resource management performed?", 2, QuestionType.DESCRIPTIVE, "hard", "Virtual clusters are groups of VMs working together. Resource management involves scheduling, load balancing, and monitoring.", "Complex coordination of distributed resources", "CO3", "K2"),
+    ("q7", "unit4", "Cloud Services", "How does an open cloud ecosystem support cloud computing?", 2, QuestionType.SHORT_ANSWER, "medium", "Provides interoperability, flexibility, and vendor independence", "Enables seamless integration across platforms", "CO4", "K2"),
+    ("q8", "unit4", "Cloud Services", "How can AWS services be applied to deploy a web application?", 2, QuestionType.DESCRIPTIVE, "hard", "Use EC2 for compute, S3 for storage, RDS for database, CloudFront for CDN", "Complete deployment architecture on AWS", "CO4", "K3"),
+    ("q9", "unit5", "Cloud Security", "In what situation might a hyper jacking attack occur in a cloud environment?", 2, QuestionType.SHORT_ANSWER, "hard", "When attacker gains control of hypervisor to compromise VMs", "Critical security vulnerability in virtualized environments", "CO5", "K3"),
+    ("q10", "unit5", "Cloud Security", "What is IAM in cloud computing and what are its challenges?", 2, QuestionType.SHORT_ANSWER, "medium", "Identity and Access Management. Challenges: complexity, integration, compliance", "Critical for security but complex to implement", "CO5", "K1"),
+]
 
 
 def test_pdf_with_co_bl():
     """Test PDF generation with CO and BL columns"""
     
-    # Create sample questions with CO and BL
-    questions = [
-        Question(
-            id="q1",
-            unit_id="unit1",
-            unit_name="Cloud Computing Fundamentals",
-            question_text="Describe the type of cloud computing.",
-            marks=2,
-            type=QuestionType.SHORT_ANSWER,
-            difficulty="easy",
-            correct_answer="Types include IaaS, PaaS, SaaS",
-            answer_explanation="Infrastructure as a Service, Platform as a Service, Software as a Service",
-            course_outcome="CO1",
-            blooms_level="K1"
-        ),
-        Question(
-            id="q2",
-            unit_id="unit1",
-            unit_name="Cloud Computing Fundamentals",
-            question_text="Difference between cloud computing and distributed computing.",
-            marks=2,
-            type=QuestionType.SHORT_ANSWER,
-            difficulty="medium",
-            correct_answer="Cloud computing uses internet-based resources, distributed computing uses multiple computers",
-            answer_explanation="Key differences in architecture and resource management",
-            course_outcome="CO1",
-            blooms_level="K2"
-        ),
-        Question(
-            id="q3",
-            unit_id="unit2",
-            unit_name="Virtualization",
-            question_text="Mention the role of hypervisor to manage virtual machines in a cloud environment.",
-            marks=2,
-            type=QuestionType.SHORT_ANSWER,
-            difficulty="medium",
-            correct_answer="Hypervisor manages VM creation, resource allocation, and isolation",
-            answer_explanation="Acts as a layer between hardware and VMs",
-            course_outcome="CO2",
-            blooms_level="K2"
-        ),
-        Question(
-            id="q4",
-            unit_id="unit2",
-            unit_name="Virtualization",
-            question_text="What is meant by hardware virtualization?",
-            marks=2,
-            type=QuestionType.SHORT_ANSWER,
-            difficulty="easy",
-            correct_answer="Process of creating virtual versions of hardware resources",
-            answer_explanation="Enables multiple OS to run on single physical hardware",
-            course_outcome="CO2",
-            blooms_level="K1"
-        ),
-        Question(
-            id="q5",
-            unit_id="unit3",
-            unit_name="Cloud Architecture",
-            question_text="List out the implementation methods of desktop virtualization.",
-            marks=2,
-            type=QuestionType.SHORT_ANSWER,
-            difficulty="medium",
-            correct_answer="VDI, Session-based, Application virtualization",
-            answer_explanation="Various methods to deliver desktop environments",
-            course_outcome="CO3",
-            blooms_level="K2"
-        ),
-        Question(
-            id="q6",
-            unit_id="unit3",
-            unit_name="Cloud Architecture",
-            question_text="What are virtual clusters in cloud computing, and how is resource management performed?",
-            marks=2,
-            type=QuestionType.DESCRIPTIVE,
-            difficulty="hard",
-            correct_answer="Virtual clusters are groups of VMs working together. Resource management involves scheduling, load balancing, and monitoring.",
-            answer_explanation="Complex coordination of distributed resources",
-            course_outcome="CO3",
-            blooms_level="K2"
-        ),
-        Question(
-            id="q7",
-            unit_id="unit4",
-            unit_name="Cloud Services",
-            question_text="How does an open cloud ecosystem support cloud computing?",
-            marks=2,
-            type=QuestionType.SHORT_ANSWER,
-            difficulty="medium",
-            correct_answer="Provides interoperability, flexibility, and vendor independence",
-            answer_explanation="Enables seamless integration across platforms",
-            course_outcome="CO4",
-            blooms_level="K2"
-        ),
-        Question(
-            id="q8",
-            unit_id="unit4",
-            unit_name="Cloud Services",
-            question_text="How can AWS services be applied to deploy a web application?",
-            marks=2,
-            type=QuestionType.DESCRIPTIVE,
-            difficulty="hard",
-            correct_answer="Use EC2 for compute, S3 for storage, RDS for database, CloudFront for CDN",
-            answer_explanation="Complete deployment architecture on AWS",
-            course_outcome="CO4",
-            blooms_level="K3"
-        ),
-        Question(
-            id="q9",
-            unit_id="unit5",
-            unit_name="Cloud Security",
-            question_text="In what situation might a hyper jacking attack occur in a cloud environment?",
-            marks=2,
-            type=QuestionType.SHORT_ANSWER,
-            difficulty="hard",
-            correct_answer="When attacker gains control of hypervisor to compromise VMs",
-            answer_explanation="Critical security vulnerability in virtualized environments",
-            course_outcome="CO5",
-            blooms_level="K3"
-        ),
-        Question(
-            id="q10",
-            unit_id="unit5",
-            unit_name="Cloud Security",
-            question_text="What is IAM in cloud computing and what are its challenges?",
-            marks=2,
-            type=QuestionType.SHORT_ANSWER,
-            difficulty="medium",
-            correct_answer="Identity and Access Management. Challenges: complexity, integration, compliance",
-            answer_explanation="Critical for security but complex to implement",
-            course_outcome="CO5",
-            blooms_level="K1"
-        ),
-    ]
+    # Create sample questions with CO and BL, validated in one call
+    questions = TypeAdapter(List[Question]).validate_python(
+        [dict(zip(QUESTION_FIELDS, row)) for row in QUESTION_ROWS]
+    )
     
     # Create question paper
     question_paper = QuestionPaper(
@@ -170,16 +70,31 @@ def test_pdf_with_co_bl():
         units_coverage={"unit1": 2, "unit2": 2, "unit3": 2, "unit4": 2, "unit5": 2}
     )
     
-    # Generate PDF
+    # Generate PDF straight into the output file
     pdf_generator = PDFGenerator()
-    pdf_buffer = pdf_generator.generate_pdf(question_paper, include_answers=True)
-    
-    # Save to file
     output_file = "generated/test_question_paper_with_co_bl.pdf"
     with open(output_file, "wb") as f:
-        f.write(pdf_buffer.read())
+        pdf_generator.generate_pdf(question_paper, include_answers=True, output=f)
+    
+    # Re-render in memory with the shared stylesheet; with reportlab's
+    # invariant mode (fixed dates/IDs) every render must be byte-identical
+    rl_config.invariant = 1
+    first = pdf_generator.generate_pdf(question_paper, include_answers=True).getvalue()
+    for _ in range(RENDER_REPEATS - 1):
+        assert pdf_generator.generate_pdf(question_paper, include_answers=True).getvalue() == first
+    
+    # Several papers in one document, each on its own pages
+    batch = [
+        question_paper.model_copy(update={"id": f"qp_test_{i:03d}"})
+        for i in range(1, BATCH_SIZE + 1)
+    ]
+    batch_file = "generated/test_batch.pdf"
+    with open(batch_file, "wb") as f:
+        pdf_generator.generate_multi(batch, include_answers=True, output=f)
     
     print(f"✓ Test PDF generated successfully: {output_file}")
+    print(f"✓ Batch PDF with {BATCH_SIZE} papers generated: {batch_file}")
+    print(f"✓ {RENDER_REPEATS} repeated renders produced identical output")
     print(f"✓ Generated {len(questions)} questions")
     print(f"✓ Each question includes CO and BL columns")
     print("\nSample question structure:")
@@ -190,7 +105,7 @@ def test_pdf_with_co_bl():
 
 if __name__ == "__main__":
     print("Testing CO and BL columns in question paper...")
-    print("=" * 60)
+    print(BANNER)
     test_pdf_with_co_bl()
-    print("=" * 60)
+    print(BANNER)
     print("Test completed successfully!")
@@ -3,16 +3,34 @@
 Test script for PDF download endpoint
 """
 import requests
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from api_client import SESSION
 
 BASE_URL = "http://localhost:8000/api"
 
+PDF_CHUNK_SIZE = 64 * 1024
+
+def save_pdf(response, filename):
+    """Stream a PDF response body to disk and return the file size"""
+    with response, open(filename, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=PDF_CHUNK_SIZE):
+            f.write(chunk)
+    return os.path.getsize(filename)
+
+def is_pdf(response):
+    """Check the response media type, ignoring any parameters such as charset"""
+    content_type = response.headers.get('Content-Type', '')
+    return content_type.split(';', 1)[0].strip() == 'application/pdf'
+
 def test_pdf_download():
     """Test PDF download endpoint"""
     
-    # First, get list of question papers
+    # First, get the first available question paper
     print("📋 Fetching available question papers...")
-    response = requests.get(f"{BASE_URL}/question-paper/")
+    response = SESSION.get(f"{BASE_URL}/question-paper/", params={"limit": 1})
     
     if response.status_code != 200:
         print(f"❌ Failed to fetch question papers: {response.status_code}")
@@ -30,9 +48,17 @@ def test_pdf_download():
     course_name = papers[0]["course_name"]
     print(f"✓ Found question paper: {paper_id} ({course_name})")
     
+    # Both renders are independent, so request them together; bodies are
+    # streamed to disk below instead of being buffered
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        no_answers, with_answers = pool.map(lambda url: SESSION.get(url, stream=True), [
+            f"{BASE_URL}/question-paper/{paper_id}/pdf",
+            f"{BASE_URL}/question-paper/{paper_id}/pdf?include_answers=true"
+        ])
+    
     # Test PDF download without answers
     print(f"\n📄 Testing PDF download (without answers)...")
-    response = requests.get(f"{BASE_URL}/question-paper/{paper_id}/pdf")
+    response = no_answers
     
     if response.status_code != 200:
         print(f"❌ Failed to download PDF: {response.status_code}")
@@ -40,39 +66,41 @@ def test_pdf_download():
         return False
     
     # Check content type
-    content_type = response.headers.get('Content-Type')
-    if content_type != 'application/pdf':
-        print(f"❌ Wrong content type: {content_type}")
+    if not is_pdf(response):
+        print(f"❌ Wrong content type: {response.headers.get('Content-Type')}")
         return False
     
     # Save PDF
     filename = f"test_{paper_id}_no_answers.pdf"
-    with open(filename, 'wb') as f:
-        f.write(response.content)
+    size = save_pdf(response, filename)
     
     print(f"✓ PDF downloaded successfully: {filename}")
-    print(f"  Size: {len(response.content)} bytes")
+    print(f"  Size: {size} bytes")
     
     # Test PDF download with answers
     print(f"\n📄 Testing PDF download (with answers)...")
-    response = requests.get(f"{BASE_URL}/question-paper/{paper_id}/pdf?include_answers=true")
+    response = with_answers
     
     if response.status_code != 200:
         print(f"❌ Failed to download PDF with answers: {response.status_code}")
         print(response.text)
         return False
     
+    # Check content type
+    if not is_pdf(response):
+        print(f"❌ Wrong content type: {response.headers.get('Content-Type')}")
+        return False
+    
     # Save PDF
     filename = f"test_{paper_id}_with_answers.pdf"
-    with open(filename, 'wb') as f:
-        f.write(response.content)
+    size = save_pdf(response, filename)
     
     print(f"✓ PDF with answers downloaded successfully: {filename}")
-    print(f"  Size: {len(response.content)} bytes")
+    print(f"  Size: {size} bytes")
     
     # Test non-existent paper
     print(f"\n📄 Testing non-existent paper...")
-    response = requests.get(f"{BASE_URL}/question-paper/qp_nonexistent/pdf")
+    response = SESSION.get(f"{BASE_URL}/question-paper/qp_nonexistent/pdf")
     
     if response.status_code != 404:
         print(f"⚠️  Expected 404, got: {response.status_code}")
@@ -4,12 +4,78 @@ Test PDF syllabus upload and question generation
 Uses the actual Data Structures Syllabus.pdf file
 """
 import requests
-import json
+import orjson
+import hashlib
 import sys
 import os
+import re
+import secrets
+from collections import defaultdict
+
+from api_client import SESSION, cached_post
 
 BASE_URL = "http://localhost:8000"
 PDF_FILE = "Data Structures Syllabus.pdf"
+COURSE_NAME = "Data Structures"
+UPLOAD_CHUNK_SIZE = 8 * 1024
+# Fallback questions mention "key concepts" or open with "Explain" (within the first 10 chars)
+FALLBACK_PATTERN = re.compile(r'key concepts|^.{0,3}explain', re.IGNORECASE | re.DOTALL)
+
+# Request: 10 MCQ (1 mark) + 5 descriptive (5 marks) + 3 essay (8 marks)
+GENERATION_RULES = {
+    "question_types": [
+        {"marks": 1, "count": 10, "type": "multiple_choice"},
+        {"marks": 5, "count": 5, "type": "descriptive"},
+        {"marks": 8, "count": 3, "type": "essay"}
+    ],
+    "difficulty_distribution": {
+        "easy": 40,
+        "medium": 40,
+        "hard": 20
+    },
+    "unit_selection": "all",
+    "include_answer_key": True,
+    "randomize_order": True
+}
+
+# Generated papers are cached per (PDF, course, rules) rather than per request,
+# since every upload gets a new syllabus id; pass --no-cache to always generate
+# a fresh paper
+def paper_cache_key():
+    """Response cache key for the paper generated from PDF_FILE with GENERATION_RULES"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(PDF_FILE, 'rb') as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    digest.update(COURSE_NAME.encode())
+    digest.update(orjson.dumps(GENERATION_RULES, option=orjson.OPT_SORT_KEYS))
+    return f"paper_{digest.hexdigest()}"
+
+def stream_multipart(fields, file_field, path, content_type):
+    """
+    Build a multipart/form-data body that reads the file in chunks as it is sent
+    
+    Returns (body, content_type header); requests sends the generator body with
+    chunked transfer encoding, so the file is never held in memory whole.
+    """
+    boundary = secrets.token_hex(16)
+    
+    def body():
+        for name, value in fields.items():
+            yield (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'
+            ).encode()
+        yield (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+            f'filename="{os.path.basename(path)}"\r\nContent-Type: {content_type}\r\n\r\n'
+        ).encode()
+        with open(path, 'rb') as f:
+            while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+        yield f'\r\n--{boundary}--\r\n'.encode()
+    
+    return body(), f'multipart/form-data; boundary={boundary}'
 
 def test_pdf_upload():
     """Test uploading the PDF syllabus"""
@@ -26,23 +92,22 @@ def test_pdf_upload():
     print(f"   Size: {os.path.getsize(PDF_FILE) / 1024:.1f} KB")
     
     try:
-        # Upload PDF file
-        with open(PDF_FILE, 'rb') as f:
-            files = {'file': (PDF_FILE, f, 'application/pdf')}
-            data = {'course_name': 'Data Structures'}
-            
-            response = requests.post(
-                f"{BASE_URL}/api/syllabus/upload/file",
-                files=files,
-                data=data,
-                timeout=30
-            )
+        # Upload PDF file, streamed from disk
+        body, content_type = stream_multipart(
+            {'course_name': COURSE_NAME}, 'file', PDF_FILE, 'application/pdf'
+        )
+        response = SESSION.post(
+            f"{BASE_URL}/api/syllabus/upload/file",
+            data=body,
+            headers={'Content-Type': content_type},
+            timeout=10  # parsed locally with PyMuPDF, no Gemini call
+        )
         
         if response.status_code != 201:
             print(f"❌ Upload failed: {response.text}")
             sys.exit(1)
         
-        syllabus = response.json()
+        syllabus = orjson.loads(response.content)
         syllabus_id = syllabus['id']
         
         print(f"\n✅ PDF uploaded and parsed successfully!")
@@ -94,37 +159,23 @@ def test_question_generation(syllabus_id):
         print("❌ No syllabus ID available")
         sys.exit(1)
     
-    # Request: 10 MCQ (1 mark) + 5 descriptive (5 marks) + 3 essay (8 marks)
     print("\n📋 Question Configuration:")
     print("   - 10 Multiple Choice Questions (1 mark each)")
     print("   - 5 Descriptive Questions (5 marks each)")
     print("   - 3 Essay Questions (8 marks each)")
     print("   Total: 18 questions, 64 marks")
     
-    print("\n⏳ Generating... (this may take 30-90 seconds)")
-    print("   Please wait while Gemini AI creates each question...")
-    
     try:
-        response = requests.post(
+        print("\n⏳ Generating... (this may take 30-90 seconds)")
+        print("   Please wait while Gemini AI creates each question...")
+        
+        response = cached_post(
             f"{BASE_URL}/api/question-paper/generate",
-            json={
+            {
                 "syllabus_id": syllabus_id,
-                "generation_rules": {
-                    "question_types": [
-                        {"marks": 1, "count": 10, "type": "multiple_choice"},
-                        {"marks": 5, "count": 5, "type": "descriptive"},
-                        {"marks": 8, "count": 3, "type": "essay"}
-                    ],
-                    "difficulty_distribution": {
-                        "easy": 40,
-                        "medium": 40,
-                        "hard": 20
-                    },
-                    "unit_selection": "all",
-                    "include_answer_key": True,
-                    "randomize_order": True
-                }
+                "generation_rules": GENERATION_RULES
             },
+            cache_key=paper_cache_key(),
             timeout=180  # 3 minutes
         )
         
@@ -134,7 +185,7 @@ def test_question_generation(syllabus_id):
             print(f"   Error: {response.text}")
             sys.exit(1)
         
-        paper = response.json()
+        paper = orjson.loads(response.content)
         
         print(f"\n✅ Question Paper Generated Successfully!")
         print("=" * 60)
@@ -146,15 +197,26 @@ def test_question_generation(syllabus_id):
         for unit_id, count in sorted(paper['units_coverage'].items()):
             print(f"   {unit_id}: {count} questions")
         
-        # Analyze question types
-        print(f"\n📋 Questions by Type:")
-        type_counts = {}
+        # Gather every per-question statistic in one pass
+        by_type = defaultdict(list)
+        marks_by_type = defaultdict(int)
+        question_texts = set()
+        with_answers = 0
+        fallback_count = 0
         for q in paper['questions']:
-            type_counts[q['type']] = type_counts.get(q['type'], 0) + 1
+            text = q['question_text']
+            by_type[q['type']].append(q)
+            marks_by_type[q['type']] += q['marks']
+            question_texts.add(text)
+            if q.get('correct_answer'):
+                with_answers += 1
+            if FALLBACK_PATTERN.search(text):
+                fallback_count += 1
         
-        for qtype, count in type_counts.items():
-            marks_sum = sum(q['marks'] for q in paper['questions'] if q['type'] == qtype)
-            print(f"   {qtype.replace('_', ' ').title()}: {count} questions ({marks_sum} marks)")
+        # Analyze question types
+        print(f"\n📋 Questions by Type:")
+        for qtype, questions in by_type.items():
+            print(f"   {qtype.replace('_', ' ').title()}: {len(questions)} questions ({marks_by_type[qtype]} marks)")
         
         # Show sample questions
         print("\n" + "=" * 60)
@@ -162,7 +224,7 @@ def test_question_generation(syllabus_id):
         print("=" * 60)
         
         # Show 2 MCQ questions
-        mcqs = [q for q in paper['questions'] if q['type'] == 'multiple_choice']
+        mcqs = by_type.get('multiple_choice', [])
         if mcqs:
             print("\n1️⃣  MULTIPLE CHOICE QUESTIONS (1 mark each):")
             for i, q in enumerate(mcqs[:2], 1):
@@ -176,7 +238,7 @@ def test_question_generation(syllabus_id):
                 print(f"       Unit: {q['unit_name']}")
         
         # Show 1 descriptive question
-        descs = [q for q in paper['questions'] if q['type'] == 'descriptive']
+        descs = by_type.get('descriptive', [])
         if descs:
             print("\n5️⃣  DESCRIPTIVE QUESTIONS (5 marks each):")
             q = descs[0]
@@ -186,7 +248,7 @@ def test_question_generation(syllabus_id):
             print(f"      Unit: {q['unit_name']}")
         
         # Show 1 essay question
-        essays = [q for q in paper['questions'] if q['type'] == 'essay']
+        essays = by_type.get('essay', [])
         if essays:
             print("\n8️⃣  ESSAY QUESTIONS (8 marks each):")
             q = essays[0]
@@ -201,7 +263,7 @@ def test_question_generation(syllabus_id):
         print("=" * 60)
         
         # Check uniqueness
-        unique_questions = len(set(q['question_text'] for q in paper['questions']))
+        unique_questions = len(question_texts)
         if unique_questions == paper['total_questions']:
             print(f"   ✅ All {unique_questions} questions are unique")
         else:
@@ -218,16 +280,12 @@ def test_question_generation(syllabus_id):
             print(f"   ⚠️  Only {mcq_with_options}/{mcq_count} MCQs have 4+ options")
         
         # Check answers
-        with_answers = sum(1 for q in paper['questions'] if q.get('correct_answer'))
         if with_answers == paper['total_questions']:
             print(f"   ✅ All questions have answers")
         else:
             print(f"   ⚠️  Only {with_answers}/{paper['total_questions']} have answers")
         
         # Check if fallback questions were used
-        fallback_count = sum(1 for q in paper['questions'] 
-                            if 'key concepts' in q['question_text'].lower() or
-                               'explain' in q['question_text'][:10].lower())
         if fallback_count == 0:
             print(f"   ✅ No obvious fallback questions detected")
         elif fallback_count < 3:
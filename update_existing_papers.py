@@ -1,12 +1,20 @@
 """
 Script to update existing question papers with CO and BL values
 """
-import json
+import sys
+from functools import lru_cache
 from pathlib import Path
 
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
 
-def determine_co_bl(marks, unit_id=None):
-    """Determine CO and BL based on marks and unit"""
+from app.utils.storage import get_storage
+
+QUESTION_PAPERS_STORE = "question_papers"
+
+
+def _resolve_co_bl(marks):
+    """CO and BL for a marks value (the original if/elif mapping)"""
     if marks == 1:
         return "CO1", "K1"
     elif marks <= 2:
@@ -21,45 +29,59 @@ def determine_co_bl(marks, unit_id=None):
         return "CO5", "K4"
 
 
+# CO / BL by marks (index = marks, clipped); everything above 8 maps alike
+CO_BL_MAX_MARKS = 9
+CO_BL_TABLE = tuple(_resolve_co_bl(m) for m in range(CO_BL_MAX_MARKS + 1))
+
+
+@lru_cache(maxsize=64)
+def determine_co_bl(marks, unit_id=None):
+    """Determine CO and BL based on marks and unit"""
+    return CO_BL_TABLE[max(0, min(marks, CO_BL_MAX_MARKS))]
+
+
 def update_question_papers():
     """Update all existing question papers with CO and BL values"""
-    storage_file = Path("storage/question_papers.json")
+    # Go through storage so its append log is replayed and folded back in
+    storage = get_storage()
+    storage_file = storage.storage_dir / f"{QUESTION_PAPERS_STORE}.json"
     
-    if not storage_file.exists():
+    # Load existing data
+    data = storage.load_store(QUESTION_PAPERS_STORE)
+    if not data:
         print("No question papers found in storage")
         return
     
-    # Load existing data
-    with open(storage_file, 'r') as f:
-        data = json.load(f)
-    
     updated_count = 0
     question_count = 0
     
-    # Update each question paper
+    # Update each question paper, tracking which ones actually changed
     for qp_id, qp_data in data.items():
         if 'questions' in qp_data:
+            paper_changes = 0
             for question in qp_data['questions']:
-                # Check if CO and BL already exist
-                if 'course_outcome' not in question or 'blooms_level' not in question:
-                    # Determine appropriate CO and BL
-                    marks = question.get('marks', 1)
-                    unit_id = question.get('unit_id', 'unit_1')
-                    
-                    co, bl = determine_co_bl(marks, unit_id)
-                    
-                    # Add CO and BL
-                    question['course_outcome'] = co
-                    question['blooms_level'] = bl
-                    
-                    question_count += 1
+                # Fill in CO and BL only where missing (one hash probe per key)
+                co, bl = determine_co_bl(question.get('marks', 1))
+                field_count = len(question)
+                question.setdefault('course_outcome', co)
+                question.setdefault('blooms_level', bl)
+                if len(question) != field_count:
+                    paper_changes += 1
             
-            updated_count += 1
-            print(f"✓ Updated question paper: {qp_id} ({len(qp_data['questions'])} questions)")
+            if paper_changes:
+                updated_count += 1
+                question_count += paper_changes
+                print(f"✓ Updated question paper: {qp_id} ({paper_changes}/{len(qp_data['questions'])} questions)")
+    
+    # Idempotent re-runs end here without serialising anything
+    if not question_count:
+        print(f"No changes: all {len(data)} question papers already have CO and BL values")
+        return
     
-    # Save updated data
-    with open(storage_file, 'w') as f:
-        json.dump(data, f, indent=2)
+    # Save updated data (one atomic orjson rewrite)
+    if not storage.save_store(QUESTION_PAPERS_STORE, data):
+        print(f"❌ Failed to write {storage_file}; existing data left untouched")
+        sys.exit(1)
     
     print(f"\n{'='*60}")
     print(f"Summary:")